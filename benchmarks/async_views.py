@@ -0,0 +1,97 @@
+"""
+Throughput of the sync and async list and detail views of a site, served
+as an ASGI handler would: sync views run in sync_to_async and async views
+are awaited, with concurrent requests in one event loop. Uses the test
+project on a temporary SQLite file.
+
+    python benchmarks/async_views.py [--requests 400] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+
+from tests import settings as test_settings
+
+
+def setup(path):
+    values = {name: getattr(test_settings, name) for name in dir(test_settings) if name.isupper()}
+    values["DATABASES"] = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": path}}
+    settings.configure(**values)
+    django.setup()
+
+
+async def serve(view, request):
+    from asgiref.sync import sync_to_async
+
+    if asyncio.iscoroutinefunction(view.func):
+        response = await view(request)
+    else:
+        response = await sync_to_async(view)(request)
+    if hasattr(response, "render"):
+        response = await sync_to_async(response.render)()
+    assert response.status_code == 200, response.status_code
+
+
+async def run(view, make_request, total, concurrency):
+    async def worker(count):
+        for _ in range(count):
+            await serve(view, make_request())
+
+    await worker(5) # Warm up
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup(os.path.join(directory, "db.sqlite3"))
+
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from django.test import RequestFactory
+
+        from hydra import site
+        from hydra.views import AsyncDetailView, AsyncListView, DetailView, ListView
+        from tests.shop.models import City, Customer
+
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        city = City.objects.create(name="Cuenca")
+        Customer.objects.bulk_create([Customer(name="Customer %s" % index, city=city) for index in range(200)])
+        customer = Customer.objects.order_by("pk").first()
+
+        model_site = site.get_modelsite(Customer)
+        factory = RequestFactory()
+
+        def make_request():
+            request = factory.get("/")
+            request.user = user
+            return request
+
+        for name, sync_class, async_class, kwargs in (
+            ("list", ListView, AsyncListView, {}),
+            ("detail", DetailView, AsyncDetailView, {"pk": customer.pk}),
+        ):
+            for mode, view_class in (("sync", sync_class), ("async", async_class)):
+                view = partial(view_class(site=model_site).get_view_class().as_view(), **kwargs)
+                rate = asyncio.run(run(view, make_request, args.requests, args.concurrency))
+                print("%-7s %-6s %7.0f req/s" % (name, mode, rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Peak memory of the streamed CSV and XLSX exports as the number of rows
+grows; it should stay flat. Runs on an in-memory SQLite database with the
+test project settings.
+
+    python benchmarks/export_memory.py [rows ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from hydra import site
+from hydra.views.export import ExportView
+from tests.shop.models import City, Customer, Product
+
+
+def fill(total):
+    customer = Customer.objects.first()
+    count = Product.objects.count()
+    while count < total:
+        size = min(20000, total - count)
+        Product.objects.bulk_create([
+            Product(name="Product %s" % index, slug="product-%s" % index, customer=customer)
+            for index in range(count, count + size)
+        ])
+        count += size
+
+
+def measure(view, user, export_format):
+    request = RequestFactory().get("/", {"format": export_format})
+    request.user = user
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in view(request).streaming_content)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    totals = [int(value) for value in sys.argv[1:]] or [1000, 10000, 100000]
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+    Customer.objects.create(name="Ana", city=City.objects.create(name="Cuenca"))
+
+    model_site = site.get_modelsite(Product)
+    view = model_site.get_view("export", ExportView(site=model_site).get_view_class)
+    for total in sorted(totals):
+        fill(total)
+        for export_format in ("csv", "xlsx"):
+            elapsed, peak, size = measure(view, user, export_format)
+            print("%8d rows  %-4s  %6.2f s  peak %6.2f MB  output %7.2f MB" % (
+                total, export_format, elapsed, peak / 1e6, size / 1e6
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time to read the values of a list of rows × columns with get_attr_of_object,
+which resolves every field path on each call, and with the accessors that
+compile_accessors builds once per site. The rows are unsaved instances with
+their relations already loaded, so no query is made.
+
+    python benchmarks/field_accessors.py [rows]
+"""
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from hydra.utils import compile_accessors, get_attr_of_object
+from tests.shop.models import City, Customer, Product
+
+
+FIELDS = (
+    "id", "name", "slug", "active", "updated", "customer",
+    "customer.id", "customer.name", "customer.city", "customer.city.name",
+)
+
+
+def get_rows(total):
+    updated = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    cities = [City(id=index, name="City %s" % index) for index in range(10)]
+    customers = [
+        Customer(id=index, name="Customer %s" % index, city=cities[index % 10])
+        for index in range(100)
+    ]
+    return [
+        Product(
+            id=index, name="Product %s" % index, slug="product-%s" % index,
+            active=bool(index % 2), updated=updated, customer=customers[index % 100],
+        )
+        for index in range(total)
+    ]
+
+
+def render_with_attrs(rows):
+    return [[get_attr_of_object(row, field) for field in FIELDS] for row in rows]
+
+
+def render_with_accessors(rows, accessors):
+    return [[accessor(row) for accessor in accessors] for row in rows]
+
+
+def best_of(function, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = get_rows(total)
+    accessors = compile_accessors(Product, FIELDS)
+
+    attrs_time, expected = best_of(render_with_attrs, rows)
+    accessors_time, values = best_of(render_with_accessors, rows, accessors)
+    assert values == expected, "The accessors read other values"
+
+    print("%d rows × %d columns" % (total, len(FIELDS)))
+    print("get_attr_of_object  %7.3f s" % attrs_time)
+    print("compiled accessors  %7.3f s  (%.1fx)" % (accessors_time, attrs_time / accessors_time))
+
+
+if __name__ == "__main__":
+    main()
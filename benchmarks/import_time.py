@@ -0,0 +1,82 @@
+"""
+Time of django.setup() and of importing hydra's modules, each run in a fresh
+interpreter with the test project settings. `hydra` and `hydra.models` are
+imported by django.setup() itself, through the app registry, so their import
+is timed there; the others are imported after it. Also reports whether the
+django.views catalog of createactions was built, which should only happen
+when the command or the action form inspects the views.
+
+    python benchmarks/import_time.py [--runs 7] [module ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = """
+import sys, time, django
+import django.apps.config
+
+# The app registry imports the apps and their models with this function
+timings = {}
+import_module = django.apps.config.import_module
+def timed_import_module(name, package=None):
+    if name in sys.modules:
+        return import_module(name, package)
+    before = set(sys.modules)
+    start = time.perf_counter()
+    module = import_module(name, package)
+    timings[name] = ((time.perf_counter() - start) * 1000, len(set(sys.modules) - before))
+    return module
+django.apps.config.import_module = timed_import_module
+
+start = time.perf_counter()
+django.setup()
+setup = (time.perf_counter() - start) * 1000
+if sys.argv[1] in timings:
+    elapsed, modules = timings[sys.argv[1]]
+else:
+    before = set(sys.modules)
+    start = time.perf_counter()
+    __import__(sys.argv[1])
+    elapsed = (time.perf_counter() - start) * 1000
+    modules = len(set(sys.modules) - before)
+from hydra.management.commands.createactions import get_views_catalog
+print("%.3f %.3f %d %d" % (setup, elapsed, modules, get_views_catalog.cache_info().currsize))
+"""
+
+
+def measure(module, runs):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="tests.settings")
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CODE, module],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+        ).stdout.split()
+        results.append((float(output[0]), float(output[1]), int(output[2]), int(output[3])))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=["hydra", "hydra.models", "hydra.forms"])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        results = measure(module, args.runs)
+        print("%-20s setup %8.2f ms  import %8.2f ms  new modules %4d  views catalog built %s" % (
+            module,
+            statistics.median(result[0] for result in results),
+            statistics.median(result[1] for result in results),
+            results[0][2],
+            "yes" if results[0][3] else "no",
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Helpers for hydra's entries in the Django cache"""
+
+# Python
+import hashlib
+import time
+
+# Django
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from hydra import settings
+
+
+def get_cache():
+    return caches[settings.CACHE_ALIAS]
+
+
+def is_shared_cache():
+    """
+    Si la caché la comparten los procesos. DummyCache no guarda las versiones
+    y LocMemCache es de cada proceso, así que un cambio no llega a los demás.
+    """
+    return not isinstance(get_cache(), (DummyCache, LocMemCache))
+
+
+def get_version_key(name):
+    return "hydra:version:%s" % name
+
+
+def get_version(name):
+    """
+    Retorna la versión compartida de `name`. Si no existe se inicia con la hora
+    actual, para no repetir una versión anterior tras una expulsión de la caché.
+    """
+    cache = get_cache()
+    key = get_version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(names):
+    """Como get_version, para varios nombres con una sola lectura de la caché"""
+    cache = get_cache()
+    keys = {get_version_key(name): name for name in names}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, now, None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(name):
+    """Invalida las entradas asociadas a `name` incrementando su versión"""
+    cache = get_cache()
+    key = get_version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+        return cache.get(key)
+
+
+def get_permission_fingerprint(user):
+    """Huella de los permisos del usuario, igual para usuarios con los mismos permisos"""
+    if not user.is_authenticated or not user.is_active:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    permissions = ",".join(sorted(user.get_all_permissions()))
+    return hashlib.sha256(permissions.encode()).hexdigest()[:32]
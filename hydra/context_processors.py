@@ -1,18 +1,40 @@
 
-# Models
-from .models import Menu
+# Django
+from django.utils.functional import SimpleLazyObject
+
+# Menus
+from .menus import get_menu_tree
 from .utils import get_user_menu
 
+# Cache
+from .cache import get_cache, get_version, get_permission_fingerprint, is_shared_cache
+from . import settings
+
 
 def menu(request):
     return {
-        "menu_tree": build_user_menu(request.user)
+        "menu_tree": SimpleLazyObject(lambda: get_cached_user_menu(request.user))
     }
 
 
 def build_user_menu(user):
     menu_list = list()
     if user.is_authenticated and user.is_active:
-        object_list = Menu.objects.filter(parent__isnull=True)
+        object_list = get_menu_tree().roots
         menu_list = get_user_menu(object_list, user)
     return menu_list
+
+
+def get_cached_user_menu(user):
+    """Retorna el menú del usuario, cacheado por versión del menú y huella de permisos"""
+    if not user.is_authenticated or not user.is_active:
+        return list()
+
+    cache = get_cache()
+    key = "hydra:menu:%s:%s" % (get_version("menu"), get_permission_fingerprint(user))
+    menu_list = cache.get(key)
+    if menu_list is None:
+        menu_list = build_user_menu(user)
+        timeout = settings.MENU_CACHE_TIMEOUT if is_shared_cache() else settings.MENU_LOCAL_TIMEOUT
+        cache.set(key, menu_list, timeout)
+    return menu_list
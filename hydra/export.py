@@ -0,0 +1,250 @@
+"""Streaming writers for list exports"""
+
+# Python
+import csv
+import datetime
+import re
+import struct
+import time
+import zlib
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+# Django
+from django.utils.html import strip_tags
+from django.utils.safestring import SafeData
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_MAX_ROWS = 1048576 # Rows per sheet allowed by Excel, header included
+XLSX_MAX_SHEET_SIZE = 4000 * 2 ** 20 # Bytes per sheet, below the 4 GiB of a zip entry
+
+ILLEGAL_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_formula(value):
+    """Antepone ' al texto que una hoja de cálculo interpretaría como fórmula"""
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def get_export_value(value):
+    """Valor de una columna apto para exportar, sin el html de la vista ni fórmulas"""
+    if value is None:
+        return ""
+    if isinstance(value, SafeData):
+        value = strip_tags(value)
+    elif isinstance(value, (list, tuple)):
+        value = ", ".join(str(item) for item in value)
+    if isinstance(value, (int, float, Decimal, datetime.date, datetime.time)):
+        return value
+    return escape_formula(str(value))
+
+
+class Echo:
+    """Buffer que retorna lo escrito, para usar csv.writer en un streaming"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class ZipStream:
+    """
+    Escribe un zip a medida que se generan sus archivos: cada archivo se
+    comprime con deflate y lleva su crc y tamaños en un descriptor al final,
+    y el directorio central se escribe al cerrar. Los archivos deben medir
+    menos de 4 GiB, pero el zip completo no: los desplazamientos y conteos
+    que no caben en el formato clásico van en los registros Zip64.
+    """
+
+    zip64_limit = 0xFFFFFFFF # Largest offset or size of the classic format
+    zip64_count_limit = 0xFFFF # Largest number of entries of the classic format
+
+    def __init__(self):
+        self.offset = 0
+        self.entries = []
+        now = time.localtime()
+        self.dos_time = now.tm_hour << 11 | now.tm_min << 5 | now.tm_sec // 2
+        self.dos_date = (now.tm_year - 1980) << 9 | now.tm_mon << 5 | now.tm_mday
+
+    def emit(self, data):
+        self.offset += len(data)
+        return data
+
+    def write_file(self, name, chunks):
+        name = name.encode()
+        offset = self.offset
+        yield self.emit(struct.pack(
+            "<4s5H3L2H", b"PK\x03\x04", 20, 0x08, zlib.DEFLATED,
+            self.dos_time, self.dos_date, 0, 0, 0, len(name), 0
+        ) + name)
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        crc = size = compressed_size = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data = compressor.compress(chunk)
+            if data:
+                compressed_size += len(data)
+                yield self.emit(data)
+        data = compressor.flush()
+        compressed_size += len(data)
+        yield self.emit(data)
+
+        if max(size, compressed_size) > 0xFFFFFFFF:
+            raise ValueError("The zip entry %s is larger than 4 GiB" % name.decode())
+        yield self.emit(struct.pack("<4s3L", b"PK\x07\x08", crc, compressed_size, size))
+        self.entries.append((name, crc, compressed_size, size, offset))
+
+    def get_directory_entry(self, name, crc, compressed_size, size, offset):
+        extra = b""
+        version = 20
+        if offset > self.zip64_limit:
+            extra = struct.pack("<2HQ", 0x0001, 8, offset)
+            offset = 0xFFFFFFFF
+            version = 45
+        return struct.pack(
+            "<4s6H3L5H2L", b"PK\x01\x02", version, version, 0x08, zlib.DEFLATED,
+            self.dos_time, self.dos_date, crc, compressed_size, size,
+            len(name), len(extra), 0, 0, 0, 0, offset
+        ) + name + extra
+
+    def close(self):
+        offset = self.offset
+        directory = b"".join(self.get_directory_entry(*entry) for entry in self.entries)
+        yield self.emit(directory)
+
+        count = len(self.entries)
+        if (
+            count > self.zip64_count_limit
+            or len(directory) > self.zip64_limit
+            or offset > self.zip64_limit
+        ):
+            zip64_offset = self.offset
+            yield self.emit(struct.pack(
+                "<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0,
+                count, count, len(directory), offset
+            ))
+            yield self.emit(struct.pack("<4sLQL", b"PK\x06\x07", 0, zip64_offset, 1))
+            count = 0xFFFF if count > self.zip64_count_limit else count
+            offset = 0xFFFFFFFF if offset > self.zip64_limit else offset
+            directory_size = 0xFFFFFFFF if len(directory) > self.zip64_limit else len(directory)
+        else:
+            directory_size = len(directory)
+
+        yield self.emit(struct.pack(
+            "<4s4H2LH", b"PK\x05\x06", 0, 0, count, count, directory_size, offset, 0
+        ))
+
+
+def get_xlsx_cell(value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        if value == value and value not in (float("inf"), float("-inf")):
+            return "<c><v>%s</v></c>" % value
+    if isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    value = ILLEGAL_XML_RE.sub("", str(value))
+    return '<c t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % escape(value)
+
+
+def get_xlsx_row(values):
+    return ("<row>%s</row>" % "".join(get_xlsx_cell(value) for value in values)).encode()
+
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+).encode()
+XLSX_SHEET_END = b"</sheetData></worksheet>"
+
+
+def stream_xlsx(headers, rows, max_rows=XLSX_MAX_ROWS, max_size=XLSX_MAX_SHEET_SIZE):
+    """
+    Genera un xlsx mínimo con filas inlineStr, sin cargarlo en memoria. Las filas
+    que superan el límite de filas de Excel, o el tamaño de un archivo del zip,
+    continúan en hojas nuevas.
+    """
+    archive = ZipStream()
+    header = get_xlsx_row(headers)
+    rows = (get_xlsx_row(row) for row in rows)
+    pending = next(rows, None)
+
+    def stream_sheet():
+        nonlocal pending
+        yield XLSX_SHEET_START
+        yield header
+        count = 1
+        size = len(XLSX_SHEET_START) + len(header) + len(XLSX_SHEET_END)
+        while pending is not None and count < max_rows:
+            if count > 1 and size + len(pending) > max_size:
+                break
+            yield pending
+            count += 1
+            size += len(pending)
+            pending = next(rows, None)
+        yield XLSX_SHEET_END
+
+    sheets = 0
+    while True:
+        sheets += 1
+        yield from archive.write_file(f"xl/worksheets/sheet{sheets}.xml", stream_sheet())
+        if pending is None:
+            break
+
+    numbers = range(1, sheets + 1)
+    yield from archive.write_file("[Content_Types].xml", [(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        + "".join(
+            f'<Override PartName="/xl/worksheets/sheet{number}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for number in numbers
+        ) +
+        '</Types>'
+    ).encode()])
+    yield from archive.write_file("_rels/.rels", [(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ).encode()])
+    yield from archive.write_file("xl/workbook.xml", [(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+        + "".join(
+            f'<sheet name="Sheet{number}" sheetId="{number}" r:id="rId{number}"/>'
+            for number in numbers
+        ) +
+        '</sheets></workbook>'
+    ).encode()])
+    yield from archive.write_file("xl/_rels/workbook.xml.rels", [(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + "".join(
+            f'<Relationship Id="rId{number}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{number}.xml"/>'
+            for number in numbers
+        ) +
+        '</Relationships>'
+    ).encode()])
+    yield from archive.close()
@@ -14,7 +14,7 @@ from django.apps import apps
 from .models import Action, Menu
 
 #
-from .management.commands.createactions import get_actions_and_elements
+from .management.commands.createactions import get_element_choices
 
 
 class ModelFormMetaclass(DjangoModelFormMetaclass):
@@ -80,11 +80,7 @@ class BaseActionForm(ModelForm):
             (app.label, app.verbose_name.capitalize()) for app in apps.get_app_configs()
         )
 
-        ELEMENT_CHOICES = [
-            (element, name)
-            for app in apps.get_app_configs() 
-            for element, name in get_actions_and_elements(app)[1].items()
-        ]
+        ELEMENT_CHOICES = get_element_choices()
 
         self.fields["app_label"].choices = APP_CHOICES
         self.fields["element"].choices = ELEMENT_CHOICES
@@ -0,0 +1,107 @@
+"""Versioned cache for rendered list rows and detail fieldsets"""
+
+# Python
+import hashlib
+
+# Django
+from django.db import transaction
+from django.utils.translation import get_language
+
+from hydra.cache import (
+    get_cache, get_version, get_versions, bump_version, get_permission_fingerprint,
+)
+from hydra import settings
+
+
+def get_generation_name(model, pk):
+    return "fragment:%s:%s" % (model._meta.label_lower, pk)
+
+
+def invalidate_fragments(model, pk):
+    """
+    Descarta los fragmentos del objeto. Se repite al confirmar la transacción, por
+    si otra request cacheó el objeto anterior mientras la transacción seguía abierta.
+    """
+    name = get_generation_name(model, pk)
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def get_related_generation_name(model):
+    return "related:%s" % model._meta.label_lower
+
+
+def invalidate_related_fragments(model):
+    """
+    Descarta todos los fragmentos y ETags del modelo, cuando cambia una fila de un
+    modelo relacionado que sus columnas muestran (customer.city.name, por ejemplo).
+    """
+    name = get_related_generation_name(model)
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+class FragmentSet:
+    """
+    Fragmentos de una página. El html cacheado se lee con un solo get_many por
+    cada bloque {% fragment %} de la plantilla, la primera vez que se pide.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.contents = {}
+
+    def get(self, key, name):
+        contents = self.contents.get(name)
+        if contents is None:
+            contents = get_cache().get_many(["%s:%s" % (key, name) for key in self.keys])
+            self.contents[name] = contents
+        return contents.get("%s:%s" % (key, name))
+
+    def set(self, key, name, content):
+        get_cache().set("%s:%s" % (key, name), content, settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+class Fragment:
+    def __init__(self, fragment_set, key):
+        self.fragment_set = fragment_set
+        self.key = key
+
+    def get(self, name):
+        return self.fragment_set.get(self.key, name)
+
+    def set(self, name, content):
+        self.fragment_set.set(self.key, name, content)
+
+
+def get_updated_value(site, object):
+    if not site.updated_field:
+        return None
+    if isinstance(object, dict):
+        return object.get(site.updated_field)
+    return getattr(object, site.updated_field)
+
+
+def get_fragments(site, kind, objects, user):
+    """
+    Retorna un Fragment por objeto (instancia o fila de values()). La clave cambia
+    con la generación del objeto y la de sus modelos relacionados, su `updated_field`,
+    el plan del site, las rutas, el usuario, sus permisos y el idioma.
+    """
+    label = site.model._meta.label_lower
+    pks = [object["pk"] if isinstance(object, dict) else object.pk for object in objects]
+    related_name = get_related_generation_name(site.model)
+    generations = get_versions([related_name, *(get_generation_name(site.model, pk) for pk in pks)])
+    common = (
+        kind, site.plan.digest, get_version("urls"), generations[related_name],
+        user.pk, get_permission_fingerprint(user), get_language(),
+    )
+
+    keys = []
+    for object, pk in zip(objects, pks):
+        state = (generations[get_generation_name(site.model, pk)], get_updated_value(site, object), *common)
+        digest = hashlib.sha256(repr(state).encode()).hexdigest()[:32]
+        keys.append("hydra:fragment:%s:%s:%s" % (label, pk, digest))
+
+    fragment_set = FragmentSet(keys)
+    return [Fragment(fragment_set, key) for key in keys]
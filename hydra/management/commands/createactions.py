@@ -1,17 +1,25 @@
 # Python 
 import inspect
+from functools import lru_cache
 from importlib import import_module
 
 # Django
 from django.views.generic import View
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.apps import apps
 
 # Models
 from hydra.models import Action
 
+# Utils
+from hydra.cache import bump_version
+from hydra.menus import rebuild_routes, suspend_menu_signals
 
+
+@lru_cache(maxsize=None)
 def get_views_catalog():
+    """Nombres de las vistas de django.views, se calcula una sola vez y al usarse"""
     module_name = "django.views"
 
     def map_module(module_name):
@@ -29,75 +37,172 @@ def get_views_catalog():
 
         return names
 
-    names = set(map_module(module_name))
-    return list(names)
-
-
-VIEWS_CATALOG = get_views_catalog()
+    return frozenset(map_module(module_name))
 
 
 class Command(BaseCommand):
     help = 'Create actions mapping all apps'
 
-    def handle(self, *args, **options):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Print the changes without applying them",
+        )
+        parser.add_argument(
+            "--prune", action="store_true",
+            help="Delete the actions whose element no longer exists, with their menus",
+        )
+
+    def get_desired_actions(self):
+        """
+        Retorna {(app_label, element): (to, name)} de las acciones que deben
+        existir, y las apps cuyas vistas no se pudieron importar.
+        """
+        desired = {}
+        broken_apps = set()
         for app in apps.get_app_configs():
-            actions, elements, m, v = get_actions_and_elements(app)
-
-            if not elements:
-                continue
-
-            acts = []
-            acts += [
-                Action(
-                    to=Action.ToChoices.MODEL,
-                    app_label=app.label,
-                    name=name,
-                    element=element,
-                )
-                for (element, name) in m.items()
-                if element not in actions
-            ]
-            acts += [
-                Action(
-                    to=Action.ToChoices.CLASSVIEW,
-                    app_label=app.label,
-                    name=name,
-                    element=element,
-                )
-                for (element, name) in v.items()
-                if element not in actions
-            ]
-
-            Action.objects.bulk_create(acts)
+            model_elements, view_elements = get_elements(app)
+            if view_elements is None:
+                broken_apps.add(app.label)
+                view_elements = {}
+            for to, elements in (
+                (Action.ToChoices.MODEL, model_elements),
+                (Action.ToChoices.CLASSVIEW, view_elements),
+            ):
+                for element, name in elements.items():
+                    desired[(app.label, element)] = (to, name)
+        return desired, broken_apps
+
+    def handle(self, *args, **options):
+        clear_elements_catalog()
+        desired, broken_apps = self.get_desired_actions()
+        for app_label in sorted(broken_apps):
+            self.stderr.write(
+                f"The views of {app_label} could not be imported, its view actions are kept"
+            )
+        existing = {
+            (action.app_label, action.element): action for action in Action.objects.all()
+        }
+
+        to_create = [
+            Action(to=to, app_label=app_label, name=name, element=element)
+            for (app_label, element), (to, name) in desired.items()
+            if (app_label, element) not in existing
+        ]
+        to_update = []
+        to_delete = []
+        for key, action in existing.items():
+            if key not in desired:
+                if action.to == Action.ToChoices.CLASSVIEW and action.app_label in broken_apps:
+                    continue
+                to_delete.append(action)
+            elif (action.to, action.name) != desired[key]:
+                action.to, action.name = desired[key]
+                to_update.append(action)
+
+        for action in to_create:
+            self.stdout.write(f"  + {action.app_label}.{action.element}")
+        for action in to_update:
+            self.stdout.write(f"  ~ {action.app_label}.{action.element}")
+        for action in to_delete:
+            self.stdout.write(f"  - {action.app_label}.{action.element}")
+        if to_delete and not options["prune"]:
+            self.stdout.write(
+                f"{len(to_delete)} stale actions are kept, pass --prune to delete them and their menus"
+            )
+            to_delete = []
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Dry run: {len(to_create)} actions to create, "
+                f"{len(to_update)} to update and {len(to_delete)} to delete"
+            )
+            return
+
+        with transaction.atomic(), suspend_menu_signals():
+            Action.objects.bulk_create(to_create)
+            Action.objects.bulk_update(to_update, ["to", "name"])
+            if to_delete:
+                # The menus of deleted actions are deleted in cascade
+                Action.objects.filter(pk__in=[action.pk for action in to_delete]).delete()
+                rebuild_routes()
+
+        if to_create or to_update or to_delete:
+            bump_version("menu")
+            bump_version("urls")
 
         self.stdout.write(self.style.SUCCESS("Successfully actions was created"))
 
 
-def get_actions_and_elements(app_config):
-    actions = {
-        action.element: action
-        for action in Action.objects.filter(app_label=app_config.label)
-    }
+_elements_catalog = {}
+
+
+def get_elements(app_config):
+    """Retorna los modelos y vistas de la app como elementos, una sola vez por proceso"""
+    elements = _elements_catalog.get(app_config.label)
+    if elements is None:
+        elements = get_model_elements(app_config), get_view_elements(app_config)
+        _elements_catalog[app_config.label] = elements
+    return elements
+
+
+def get_element_choices():
+    """Opciones (elemento, nombre) de todas las apps instaladas"""
+    choices = []
+    for app in apps.get_app_configs():
+        model_elements, view_elements = get_elements(app)
+        choices.extend({**model_elements, **(view_elements or {})}.items())
+    return choices
+
 
-    model_elements = {
+def clear_elements_catalog():
+    """Limpia el catálogo de elementos, p.ej. cuando el autoreload detecta cambios"""
+    _elements_catalog.clear()
+
+
+def get_model_elements(app_config):
+    return {
         model._meta.model_name: (
             f"{app_config.verbose_name.capitalize()} | {model._meta.verbose_name.capitalize()}"
         )
         for model in app_config.get_models()
     }
 
+
+def get_view_elements(app_config):
+    """
+    Retorna las vistas de la app como elementos, {} si la app no tiene un
+    módulo views y None si el módulo existe pero falló al importarse.
+    """
+    module_name = f"{app_config.name}.views"
     try:
-        module = import_module(f"{app_config.name}.views")
-        view_elements = {
-            name: (
-                f"{app_config.verbose_name.capitalize()} | {name}"
-            )
-            for name, candidate in inspect.getmembers(module, inspect.isclass)
-            if issubclass(candidate, View) and not candidate.__name__ in VIEWS_CATALOG
-        }
-    except (ModuleNotFoundError, ImportError):
-        view_elements = {}
+        module = import_module(module_name)
+    except ModuleNotFoundError as error:
+        if error.name != module_name:
+            return None
+        return {}
+    except ImportError:
+        return None
+
+    view_elements = {
+        name: (
+            f"{app_config.verbose_name.capitalize()} | {name}"
+        )
+        for name, candidate in inspect.getmembers(module, inspect.isclass)
+        if issubclass(candidate, View) and not candidate.__name__ in get_views_catalog()
+    }
+
+    return view_elements
+
+
+def get_actions_and_elements(app_config):
+    actions = {
+        action.element: action
+        for action in Action.objects.filter(app_label=app_config.label)
+    }
 
+    model_elements, view_elements = get_elements(app_config)
+    view_elements = view_elements or {}
     elements = {
         **model_elements,
         **view_elements
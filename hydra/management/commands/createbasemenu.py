@@ -1,57 +1,166 @@
+# Python
+from collections import namedtuple
+
 # Django
 from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
+from django.db import transaction
+from django.utils.text import slugify
 
 # Models
 from hydra.models import Action, Menu
 
+# Utils
+from hydra.cache import bump_version
+from hydra.menus import rebuild_routes, suspend_menu_signals
+
 #
 from hydra import site
 
 
+MenuSpec = namedtuple("MenuSpec", "name parent action sequence depth is_group")
+
+MENU_FIELDS = ("name", "parent_id", "action_id", "sequence", "depth", "is_group")
+
+
 class Command(BaseCommand):
     help = 'Create base menu mapping all apps'
 
-    def handle(self, *args, **options):
-        call_command("createactions")
-        
-        Menu.objects.all().delete()
-
-        default_action = Action.objects.get(app_label="hydra", element="ModuleView")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Print the changes without applying them",
+        )
+        parser.add_argument(
+            "--prune", action="store_true",
+            help="Delete every menu outside the base menu, also the ones created in the admin",
+        )
 
+    def get_desired_menus(self):
+        """Retorna {ruta: MenuSpec} del menú base, un grupo por app con sus modelos"""
         apps = {}
         for model in site._registry:
-            if model._meta.app_config in apps:
-                apps[model._meta.app_config].append(model)
-            else:
-                apps[model._meta.app_config] = [model]
-
-        sequence = 1
-        for app in apps:
-            menu = Menu.objects.create(
-                name=app.verbose_name.capitalize(),
-                action=default_action,
-                is_group=True,
-                sequence=sequence
-            )
-            sequence += 1
-
-            index = 1
-            for model in apps[app]:
-                action = Action.objects.get(app_label=app.label, element=model._meta.model_name)
-
-                Menu.objects.create(
-                    parent=menu,
-                    name=model._meta.verbose_name_plural.capitalize(),
-                    action=action,
-                    is_group=False,
-                    sequence=index
+            apps.setdefault(model._meta.app_config, []).append(model)
+
+        desired = {}
+        for sequence, (app, models) in enumerate(apps.items(), start=1):
+            name = app.verbose_name.capitalize()
+            route = slugify(name)
+            desired[route] = MenuSpec(name, None, ("hydra", "ModuleView"), sequence, 0, True)
+
+            for index, model in enumerate(models, start=1):
+                child_name = model._meta.verbose_name_plural.capitalize()
+                desired[f"{route}/{slugify(child_name)}"] = MenuSpec(
+                    child_name, route, (app.label, model._meta.model_name), index, 1, False
                 )
+        return desired
 
-                index += 1
+    def get_values(self, spec, actions, parents):
+        return {
+            "name": spec.name,
+            "parent_id": parents.get(spec.parent),
+            "action_id": actions.get(spec.action),
+            "sequence": spec.sequence,
+            "depth": spec.depth,
+            "is_group": spec.is_group,
+        }
 
+    def get_menus_to_delete(self, existing, desired, actions):
+        """
+        Menús fuera del menú base que pudo crear el comando: grupos de primer nivel
+        con ModuleView y sus submenús con la acción de un modelo. No incluye los
+        menús con submenús que se conservan, que se borrarían en cascada.
+        """
+        module_view = actions.get(("hydra", "ModuleView"))
+        model_actions = set(Action.objects.filter(to=Action.ToChoices.MODEL).values_list("pk", flat=True))
+        groups = {menu.pk for menu in existing.values() if not menu.depth and menu.action_id == module_view}
 
-        self.stdout.write(self.style.SUCCESS("Successfully base menu was created"))
+        stale = {
+            menu.pk: menu for route, menu in existing.items()
+            if route not in desired and (
+                menu.pk in groups
+                or menu.depth == 1 and menu.parent_id in groups and menu.action_id in model_actions
+            )
+        }
+        while True:
+            kept_parents = {menu.parent_id for menu in existing.values() if menu.pk not in stale}
+            blocked = [pk for pk in stale if pk in kept_parents]
+            if not blocked:
+                return list(stale.values())
+            for pk in blocked:
+                del stale[pk]
 
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        call_command("createactions", dry_run=dry_run, stdout=self.stdout)
 
-    
\ No newline at end of file
+        actions = {
+            (app_label, element): pk
+            for pk, app_label, element in Action.objects.values_list("pk", "app_label", "element")
+        }
+        if ("hydra", "ModuleView") not in actions and not dry_run:
+            raise CommandError("The action 'hydra.ModuleView' does not exist")
+
+        desired = self.get_desired_menus()
+        existing = {menu.route: menu for menu in Menu.objects.all()}
+        parents = {route: menu.pk for route, menu in existing.items()}
+
+        to_create = [route for route in desired if route not in existing]
+        to_update = []
+        for route, menu in existing.items():
+            if route not in desired:
+                continue
+            values = self.get_values(desired[route], actions, parents)
+            changed = [field for field in MENU_FIELDS if getattr(menu, field) != values[field]]
+            if changed:
+                to_update.append((menu, values, changed))
+        if options["prune"]:
+            to_delete = [menu for route, menu in existing.items() if route not in desired]
+        else:
+            to_delete = self.get_menus_to_delete(existing, desired, actions)
+            kept = sum(route not in desired for route in existing) - len(to_delete)
+
+        for route in to_create:
+            self.stdout.write(f"  + {route}")
+        for menu, values, changed in to_update:
+            self.stdout.write(f"  ~ {menu.route} ({', '.join(changed)})")
+        for menu in to_delete:
+            self.stdout.write(f"  - {menu.route}")
+        if not options["prune"] and kept:
+            self.stdout.write(
+                f"{kept} menus outside the base menu are kept, pass --prune to delete them"
+            )
+
+        if dry_run:
+            self.stdout.write(
+                f"Dry run: {len(to_create)} menus to create, "
+                f"{len(to_update)} to update and {len(to_delete)} to delete"
+            )
+            return
+
+        with transaction.atomic(), suspend_menu_signals():
+            # Groups first, so that the new submenus can point to them
+            for depth in (0, 1):
+                Menu.objects.bulk_create([
+                    Menu(route=route, **self.get_values(desired[route], actions, parents))
+                    for route in to_create if desired[route].depth == depth
+                ])
+                if depth == 0:
+                    parents.update(Menu.objects.filter(
+                        route__in=[route for route, spec in desired.items() if not spec.depth]
+                    ).values_list("route", "pk"))
+
+            for menu, values, changed in to_update:
+                values["parent_id"] = parents.get(desired[menu.route].parent)
+                for field, value in values.items():
+                    setattr(menu, field, value)
+            Menu.objects.bulk_update([menu for menu, *_ in to_update], MENU_FIELDS)
+
+            Menu.objects.filter(pk__in=[menu.pk for menu in to_delete]).delete()
+            rebuild_routes()
+
+        if to_create or to_update or to_delete:
+            bump_version("menu")
+            bump_version("urls")
+
+        self.stdout.write(self.style.SUCCESS("Successfully base menu was created"))
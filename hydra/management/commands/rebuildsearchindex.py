@@ -0,0 +1,44 @@
+# Django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+#
+from hydra import site
+
+
+class Command(BaseCommand):
+    help = 'Create the full text search indexes and fill them with the existing rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*",
+            help="Models to index as app_label.ModelName, by default every registered model",
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+            help="Database whose indexes are rebuilt, by default 'default'",
+        )
+
+    def get_model_sites(self, labels):
+        if not labels:
+            return list(site._registry.values())
+
+        model_sites = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as error:
+                raise CommandError(str(error))
+            if not site.is_registered(model):
+                raise CommandError(f"The model {label} is not registered in the site")
+            model_sites.append(site.get_modelsite(model))
+        return model_sites
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        for model_site in self.get_model_sites(options["models"]):
+            model_site.search_backend.rebuild_index(using=using)
+            self.stdout.write(f"Indexed {model_site.model._meta.label}")
+
+        self.stdout.write(self.style.SUCCESS("Successfully rebuilt the search indexes"))
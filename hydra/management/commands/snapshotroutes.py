@@ -0,0 +1,33 @@
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+#
+from hydra import site
+from hydra import settings
+from hydra.snapshot import dump_snapshot
+from hydra.cache import get_version
+
+
+class Command(BaseCommand):
+    help = 'Write the menu routes snapshot used to build the site urls'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Path of the snapshot file, by default the ROUTES_SNAPSHOT setting",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or settings.ROUTES_SNAPSHOT
+        if not path:
+            raise CommandError("Set the ROUTES_SNAPSHOT setting or pass --output")
+
+        # Read before the menus, a change in between leaves the snapshot outdated
+        urls_version = get_version("urls")
+        menus = site.get_menus()
+        if menus is None:
+            raise CommandError("The menu table does not exist, run migrate first")
+
+        count = dump_snapshot(menus, path, urls_version)
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully {count} routes were written to {path}"))
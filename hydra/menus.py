@@ -0,0 +1,205 @@
+"""In-memory menu tree"""
+
+# Python
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Django
+from django.apps import apps
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.utils.text import slugify
+
+# Cache
+from .cache import get_version, is_shared_cache
+from . import settings
+
+
+class RouteNode:
+    """Nodo del trie de rutas, uno por segmento"""
+
+    __slots__ = ("children", "menu")
+
+    def __init__(self):
+        self.children = {}
+        self.menu = None
+
+
+class MenuTree:
+    """
+    Árbol de menús armado en memoria. Se carga con un número fijo de consultas
+    (los menús con su acción y los permisos de las acciones) y cada menú queda
+    enlazado a su padre y a sus hijos, en `children`, sin volver a la base de datos.
+    Las rutas se indexan además en un trie por segmentos y el breadcrumb de cada
+    menú se calcula al construir el árbol.
+    """
+
+    def __init__(self, menus, version=None):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.menus = {menu.pk: menu for menu in menus}
+        self.routes = {menu.route: menu for menu in menus}
+        self.roots = []
+
+        for menu in menus:
+            menu.children = []
+
+        for menu in sorted(menus, key=lambda menu: (menu.depth, menu.route)):
+            parent = self.menus.get(menu.parent_id)
+            if parent is None:
+                self.roots.append(menu)
+                continue
+            menu.parent = parent
+            parent.children.append(menu)
+
+        for menu in menus:
+            menu.children.sort(key=lambda child: (child.route, child.sequence))
+        self.roots.sort(key=lambda menu: (menu.route, menu.sequence))
+
+        self.trie = RouteNode()
+        for menu in menus:
+            node = self.trie
+            for segment in menu.route.split("/"):
+                node = node.children.setdefault(segment, RouteNode())
+            node.menu = menu
+
+        self.breadcrumbs = {}
+        for menu in menus:
+            self.get_breadcrumbs(menu)
+
+    @classmethod
+    def load(cls, version=None):
+        Menu = apps.get_model("hydra", "Menu")
+        menus = Menu.objects.select_related("action").prefetch_related("action__permissions")
+        return cls(list(menus), version)
+
+    def get(self, pk):
+        return self.menus.get(pk)
+
+    def get_by_route(self, route):
+        return self.routes.get(route)
+
+    def match(self, path):
+        """Retorna el menú con la ruta más larga que es prefijo de `path`"""
+        node, menu = self.trie, None
+        for segment in path.strip("/").split("/"):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.menu is not None:
+                menu = node.menu
+        return menu
+
+    def get_breadcrumbs(self, menu):
+        """Retorna la cadena (nombre, url) desde la raíz hasta el menú"""
+        breadcrumbs = self.breadcrumbs.get(menu.pk)
+        if breadcrumbs is None:
+            parent = self.menus.get(menu.parent_id)
+            breadcrumbs = self.get_breadcrumbs(parent) if parent else ()
+            breadcrumbs += ((menu.name, f"/{menu.route}/"),)
+            self.breadcrumbs[menu.pk] = breadcrumbs
+        return breadcrumbs
+
+
+_tree = None
+_tree_lock = threading.Lock()
+
+
+def is_stale(tree, version):
+    if tree is None or version is None or tree.version != version:
+        return True
+    # Sin caché compartida la versión solo cambia con los guardados de este proceso
+    if not is_shared_cache():
+        return time.monotonic() - tree.loaded_at > settings.MENU_LOCAL_TIMEOUT
+    return False
+
+
+def get_menu_tree():
+    """
+    Retorna el árbol de menús del proceso. Se vuelve a cargar cuando cambia la
+    versión compartida del menú, es decir, al guardar o borrar menús o acciones.
+    Con LocMemCache vence además a los MENU_LOCAL_TIMEOUT segundos, y con
+    DummyCache, que no guarda la versión, se carga en cada llamada.
+    """
+    global _tree
+    version = get_version("menu")
+    tree = _tree
+    if is_stale(tree, version):
+        with _tree_lock:
+            tree = _tree
+            if is_stale(tree, version):
+                tree = MenuTree.load(version)
+                _tree = tree
+    return tree
+
+
+def update_subtree_routes(old_route, new_route, depth_delta=0):
+    """Reescribe con un solo UPDATE la ruta y profundidad de los descendientes"""
+    Menu = apps.get_model("hydra", "Menu")
+    return Menu.objects.filter(route__startswith=f"{old_route}/").update(
+        route=Concat(Value(new_route), Substr("route", len(old_route) + 1)),
+        depth=F("depth") + depth_delta,
+    )
+
+
+def update_groups(pks):
+    """Recalcula is_group solo para los menús indicados"""
+    Menu = apps.get_model("hydra", "Menu")
+    pks = {pk for pk in pks if pk is not None}
+    if not pks:
+        return set()
+    groups = set(
+        Menu.objects.filter(parent__in=pks).values_list("parent", flat=True).distinct()
+    )
+    Menu.objects.filter(pk__in=groups, is_group=False).update(is_group=True)
+    Menu.objects.filter(pk__in=pks - groups, is_group=True).update(is_group=False)
+    return groups
+
+
+def rebuild_routes():
+    """
+    Recalcula la ruta, profundidad e is_group de todos los menús con una sola
+    lectura y un bulk_update de los que cambiaron. Retorna cuántos cambiaron.
+    """
+    Menu = apps.get_model("hydra", "Menu")
+    menus = list(Menu.objects.only("parent", "name", "route", "depth", "is_group"))
+    children = defaultdict(list)
+    for menu in menus:
+        children[menu.parent_id].append(menu)
+
+    changed = []
+    stack = [(menu, None) for menu in children[None]]
+    while stack:
+        menu, parent = stack.pop()
+        route = f"{parent.route}/{slugify(menu.name)}" if parent else slugify(menu.name)
+        depth = parent.depth + 1 if parent else 0
+        is_group = bool(children[menu.pk])
+        if (menu.route, menu.depth, menu.is_group) != (route, depth, is_group):
+            menu.route, menu.depth, menu.is_group = route, depth, is_group
+            changed.append(menu)
+        stack.extend((child, menu) for child in children[menu.pk])
+
+    Menu.objects.bulk_update(changed, ["route", "depth", "is_group"], batch_size=500)
+    return len(changed)
+
+
+_signals = threading.local()
+
+
+@contextmanager
+def suspend_menu_signals():
+    """
+    Suspende en el hilo actual las señales por fila de menús y acciones, para
+    sincronizaciones masivas que recalculan las rutas y versiones al final.
+    """
+    _signals.suspended = getattr(_signals, "suspended", 0) + 1
+    try:
+        yield
+    finally:
+        _signals.suspended -= 1
+
+
+def menu_signals_suspended():
+    return getattr(_signals, "suspended", 0) > 0
@@ -0,0 +1,28 @@
+"""Hydra middlewares"""
+
+# Django
+from django.urls import get_resolver
+
+# Hydra
+from hydra import site
+
+
+class UrlsReloadMiddleware:
+    """
+    Vuelve a generar las urls del site en este proceso cuando cambian los menús
+    en cualquier otro. Con una caché que no es compartida entre procesos las urls
+    se regeneran cada MENU_LOCAL_TIMEOUT segundos.
+
+    También carga el urlconf en la primera request: en ASGI este middleware corre
+    en un hilo, y las urls del site, que se leen de la base de datos, no pueden
+    generarse dentro del event loop.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        urlconf = getattr(request, "urlconf", None)
+        get_resolver(urlconf).url_patterns
+        site.check_urls(urlconf)
+        return self.get_response(request)
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+def set_depth(apps, schema_editor):
+    Menu = apps.get_model('hydra', 'Menu')
+    menus = list(Menu.objects.all())
+    for menu in menus:
+        menu.depth = menu.route.count('/')
+    Menu.objects.bulk_update(menus, ['depth'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydra', '0001_action_menu'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='profundidad'),
+        ),
+        migrations.RunPython(set_depth, migrations.RunPython.noop),
+    ]
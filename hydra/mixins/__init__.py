@@ -4,3 +4,5 @@ from .urls import UrlMixin
 from .templates import TemplateMixin
 from .permissions import PermissionRequiredMixin
 from .filters import FilterMixin
+from .conditional import ConditionalMixin
+from .objects import ObjectCacheMixin
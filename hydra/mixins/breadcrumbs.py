@@ -7,23 +7,15 @@ from django.utils.html import format_html
 from hydra.shortcuts import get_slug_or_pk
 
 # Utils
-from hydra.utils import import_class
+from hydra.menus import get_menu_tree
 from hydra import settings
 
 class BreadcrumbMixin:
     """Clase base que contiene la información común de todas las subclases"""
 
     def get_menu_in_path(self, path):
-        Menu = import_class("hydra.models", "Menu")
-        if not Menu: return
         if not path: return
-
-        try:
-            menu = Menu.objects.get(route=path)
-            return menu
-        except Menu.DoesNotExist:
-            path = "/".join(path.split("/")[0: -1])
-            return self.get_menu_in_path(path)
+        return get_menu_tree().match(path)
 
     def get_breadcrumb_text(self, action):
         attr = "breadcrumb_%s_text" % action
@@ -35,10 +27,7 @@ class BreadcrumbMixin:
         return format_html(text)
 
     def get_base(self, menu):
-        base = [(menu.name, f"/{menu.route}/")]
-        if menu.parent:
-            base =  self.get_base(menu.parent) + base
-        return base
+        return list(get_menu_tree().get_breadcrumbs(menu))
 
     def get_base_breadcrumbs(self):
         base_breadcrumbs = [(self.get_breadcrumb_text("home"), "/")]
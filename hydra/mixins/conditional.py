@@ -0,0 +1,106 @@
+# Python
+import datetime
+import hashlib
+from asgiref.sync import sync_to_async
+
+# Django
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+# Utils
+from hydra.cache import get_version, get_permission_fingerprint
+from hydra.fragments import get_related_generation_name
+
+
+class ConditionalMixin:
+    """
+    GET condicional para las vistas de lista y detalle de sites con `updated_field`.
+    El ETag se calcula con una consulta mínima antes de armar la página, y si
+    coincide con If-None-Match se responde 304 sin consultar las filas ni renderizar.
+    Incluye la generación de los modelos relacionados que muestran las columnas.
+    """
+
+    conditional_actions = ("list", "detail")
+
+    def is_conditional(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and self.action in self.conditional_actions
+            and bool(self.site.updated_field)
+        )
+
+    def get_list_validators(self):
+        """Máximo de `updated_field` y conteo de las filas filtradas, en una sola consulta"""
+        result = self.get_queryset().aggregate(
+            last_modified=Max(self.site.updated_field), count=Count("pk")
+        )
+        return result["last_modified"], (result["last_modified"], result["count"])
+
+    def get_detail_validators(self):
+        lookup_field = self.site.plan.lookup_field
+        queryset = self.get_queryset().filter(**{lookup_field: self.kwargs[lookup_field]})
+        row = queryset.values_list("pk", self.site.updated_field)[:1]
+        row = next(iter(row), None)
+        if row is None:
+            return None, None # La vista responde 404
+        return row[1], row
+
+    def get_validators(self):
+        """Retorna (etag, last_modified) de la página, o (None, None) si no aplica"""
+        last_modified, state = getattr(self, "get_%s_validators" % self.action)()
+        if state is None:
+            return None, None
+
+        user = self.request.user
+        parts = (
+            *state, get_version(get_related_generation_name(self.model)),
+            user.pk, get_permission_fingerprint(user), get_version("menu"),
+            get_language(), self.request.get_full_path(),
+        )
+        etag = 'W/"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+        # Last-Modified solo en el detalle: en la lista un borrado no cambia el máximo
+        if self.action != "detail" or not isinstance(last_modified, datetime.date):
+            last_modified = None
+        elif not isinstance(last_modified, datetime.datetime):
+            last_modified = datetime.datetime.combine(last_modified, datetime.time())
+        return etag, last_modified and int(last_modified.timestamp()) # Segundos, como el header
+
+    def set_validators(self, response):
+        if self.etag and not response.has_header("ETag"):
+            response["ETag"] = self.etag
+        if self.last_modified and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(self.last_modified)
+        patch_vary_headers(response, ("Cookie",))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_conditional_response(self, request):
+        self.etag, self.last_modified = self.get_validators()
+        if self.etag is None:
+            return None
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is not None:
+            self.set_validators(response)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return super().dispatch(request, *args, **kwargs)
+        if getattr(self, "view_is_async", False): # Django 4.1+
+            return self.adispatch_conditional(request, *args, **kwargs)
+
+        response = self.get_conditional_response(request)
+        if response is not None:
+            return response
+        return self.set_validators(super().dispatch(request, *args, **kwargs))
+
+    async def adispatch_conditional(self, request, *args, **kwargs):
+        response = await sync_to_async(self.get_conditional_response)(request)
+        if response is not None:
+            return response
+        return self.set_validators(await super().dispatch(request, *args, **kwargs))
@@ -1,24 +1,9 @@
-# Python
-import operator
-from functools import reduce
-
-# Django
-from django.db.models import Q
-
-
 class FilterMixin:
-    def get_params(self, value):
-        args = []
-        for field in self.site.search_fields:
-            args.append(Q(**{field: value}))
-        
-        return reduce(operator.__or__, args)
-
     def get_queryset(self):
         queryset = super().get_queryset()
         search_value = self.request.GET.get("search")
         if search_value:
-            queryset = queryset.filter(self.get_params(search_value))
+            queryset = self.site.search_backend.search(queryset, search_value)
         return queryset
 
 
@@ -0,0 +1,18 @@
+# Django
+from django.http import Http404
+
+
+class ObjectCacheMixin:
+    """Lee el objeto de la vista desde la caché de objetos del site, si está activa"""
+
+    def get_object(self, queryset=None):
+        if not self.site.object_cache or queryset is not None:
+            return super().get_object(queryset)
+
+        lookup_field = self.site.plan.lookup_field
+        try:
+            return self.site.object_store.get(
+                self.get_queryset(), lookup_field, self.kwargs[lookup_field]
+            )
+        except self.model.DoesNotExist:
+            raise Http404("No %s found matching the query" % self.model._meta.verbose_name)
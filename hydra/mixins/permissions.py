@@ -1,5 +1,8 @@
 """Mixins for autosite"""
 
+# Python
+from asgiref.sync import sync_to_async
+
 # Django
 from django.contrib.auth.mixins import (
     PermissionRequiredMixin as DjangoPermissionRequiredMixin
@@ -50,3 +53,28 @@ class PermissionRequiredMixin(DjangoPermissionRequiredMixin):
             return True
         perms = self.get_permission_required()
         return any(user.has_perm(perm) for perm in perms)
+
+    async def ahas_permission(self):
+        if not hasattr(self.request, "auser"): # Before Django 5.0, in a single thread hop
+            return await sync_to_async(self.has_permission)()
+
+        user = await self.request.auser()
+        if all([user.is_authenticated, user.is_superuser, user.is_active]):
+            return True
+        perms = list(self.get_permission_required())
+        if hasattr(user, "ahas_perm"): # Django 5.2+
+            for perm in perms:
+                if await user.ahas_perm(perm):
+                    return True
+            return False
+        return await sync_to_async(lambda: any(user.has_perm(perm) for perm in perms))()
+
+    def dispatch(self, request, *args, **kwargs):
+        if getattr(self, "view_is_async", False): # Django 4.1+
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        if not await self.ahas_permission():
+            return await sync_to_async(self.handle_no_permission)()
+        return await super(DjangoPermissionRequiredMixin, self).dispatch(request, *args, **kwargs)
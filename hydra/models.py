@@ -106,6 +106,10 @@ class Menu(models.Model):
         unique=True, editable=False,
         verbose_name='ruta de acceso'
     )
+    depth = models.PositiveSmallIntegerField(
+        default=0, editable=False,
+        verbose_name='profundidad'
+    )
     action = models.ForeignKey(
         Action,
         on_delete=models.CASCADE,
@@ -130,15 +134,21 @@ class Menu(models.Model):
         return f"{self.name} | {self.get_route()}" 
 
     def get_route(self):
-        route = f"{self.parent.get_route()}/{slugify(self.name)}" if self.parent else slugify(self.name)
+        route = f"{self.parent.route}/{slugify(self.name)}" if self.parent else slugify(self.name)
         return route
 
+    def get_depth(self):
+        return self.parent.depth + 1 if self.parent else 0
+
     def get_url(self):
         url_name = None
         if self.action.to == Action.ToChoices.MODEL:
             model_class = self.action.get_model_class()
             if model_class and model_class in site._registry:
                 model_site = site._registry[model_class]
+                url = model_site.get_url_templates().get_urls().get("list")
+                if url:
+                    return url
                 url_name = model_site.get_url_name("list")
         else:
             url_name = f"site:{slugify(self.name)}"
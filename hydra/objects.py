@@ -0,0 +1,156 @@
+"""Read-through cache for the objects opened by detail, update and delete views"""
+
+# Python
+import hashlib
+import threading
+
+# Django
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+
+from hydra.cache import get_cache, get_version, get_version_key, bump_version
+from hydra import settings
+
+
+# Rows written by the open transaction of each thread: {alias: {(model label, pk): [callback, ...]}}.
+# Each write registers an on_commit callback that forgets it; a rollback drops the
+# callbacks of the rolled back savepoints, and their writes are ignored from then on.
+_writes = threading.local()
+
+
+def record_write(model, pk, using):
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return
+    written = getattr(_writes, "rows", None)
+    if written is None:
+        written = _writes.rows = {}
+    key = (model._meta.label_lower, pk)
+    callbacks = written.setdefault(using, {}).setdefault(key, [])
+
+    def forget():
+        rows = written.get(using, {})
+        if key in rows and forget in rows[key]:
+            rows[key].remove(forget)
+            if not rows[key]:
+                del rows[key]
+
+    callbacks.append(forget)
+    transaction.on_commit(forget, using=using)
+
+
+def get_written_rows(model, using):
+    """
+    Pks del modelo escritos en la transacción abierta. Se descartan al confirmarla,
+    o al revertir la transacción o el savepoint en que se escribieron.
+    """
+    written = getattr(_writes, "rows", None)
+    if not written or using not in written:
+        return set()
+
+    connection = transaction.get_connection(using)
+    pending = set()
+    if connection.in_atomic_block:
+        pending = {id(entry[1]) for entry in connection.run_on_commit}
+    rows = {}
+    for key, callbacks in written[using].items():
+        callbacks = [callback for callback in callbacks if id(callback) in pending]
+        if callbacks:
+            rows[key] = callbacks
+    if not rows:
+        del written[using]
+        return set()
+
+    written[using] = rows
+    label = model._meta.label_lower
+    return {pk for key_label, pk in rows if key_label == label}
+
+
+class ObjectCache:
+    """
+    Objetos del site en la caché, por pk y por slug. Cada entrada guarda la
+    generación del objeto, que post_save y post_delete incrementan, y un slug
+    solo guarda el pk, así un cambio de slug no deja el objeto anterior.
+    """
+
+    def __init__(self, model, timeout=None):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.timeout = settings.OBJECT_CACHE_TIMEOUT if timeout is None else timeout
+        self.counters = {"hits": 0, "misses": 0, "bypasses": 0}
+        self.lock = threading.Lock()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def get_generation_name(self, pk):
+        return "object:%s:%s" % (self.label, pk)
+
+    def get_key(self, query_key, field, value):
+        return "hydra:object:%s:%s:%s:%s" % (self.label, query_key, field, value)
+
+    def invalidate(self, sender, instance, using, **kwargs):
+        """Receptor de post_save y post_delete; se repite al confirmar la transacción"""
+        name = self.get_generation_name(instance.pk)
+        bump_version(name)
+        transaction.on_commit(lambda: bump_version(name), using=using)
+        record_write(self.model, instance.pk, using)
+
+    def get(self, queryset, field, value):
+        """
+        Retorna queryset.get(field=value) desde la caché si su generación sigue
+        vigente. Las filas escritas en la transacción abierta se leen de la base
+        de datos, y mientras tanto nada de este modelo se guarda en la caché.
+        """
+        written = get_written_rows(self.model, queryset.db)
+        if written and (field != "pk" or value in written):
+            self.count("bypasses")
+            return queryset.get(**{field: value})
+
+        try:
+            # The same pk may be visible or not depending on the site queryset
+            query_key = hashlib.sha256(str(queryset.query).encode()).hexdigest()[:16]
+        except EmptyResultSet:
+            self.count("bypasses")
+            return queryset.get(**{field: value})
+
+        cache = get_cache()
+        pk = value if field == "pk" else cache.get(self.get_key(query_key, field, value))
+        if pk is not None:
+            name = self.get_generation_name(pk)
+            object_key = self.get_key(query_key, "pk", pk)
+            entries = cache.get_many([get_version_key(name), object_key])
+            entry = entries.get(object_key)
+            if entry is not None and entry[0] == entries.get(get_version_key(name)):
+                instance = entry[1]
+                if getattr(instance, field) == value:
+                    self.count("hits")
+                    return instance
+
+        self.count("misses")
+        if written:
+            return queryset.get(**{field: value})
+
+        if pk is not None:
+            # The generation is read before the query, so a save in between invalidates the entry
+            generation = get_version(self.get_generation_name(pk))
+            lookup = {"pk": pk} if field == "pk" else {"pk": pk, field: value}
+            try:
+                instance = queryset.get(**lookup)
+            except self.model.DoesNotExist:
+                if field == "pk":
+                    raise
+            else:
+                cache.set(self.get_key(query_key, "pk", pk), (generation, instance), self.timeout)
+                return instance
+
+        # The pk of the slug is unknown until the query: only the slug is stored,
+        # and the next lookup stores the object once its generation is read
+        instance = queryset.get(**{field: value})
+        cache.set(self.get_key(query_key, field, value), instance.pk, self.timeout)
+        return instance
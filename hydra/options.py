@@ -1,18 +1,45 @@
+# Python
+import hashlib
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
 # Django
-from django.core.exceptions import ImproperlyConfigured
+import django
+from django.core.exceptions import ImproperlyConfigured, FieldDoesNotExist
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.contrib.admin.utils import flatten
 from django.utils.text import slugify
-from django.urls import path
+from django.urls import path, get_script_prefix, get_urlconf
 
 # Views
 from .views import (
     ListView, CreateView, UpdateView, DetailView, DeleteView,
-    DuplicateView,
+    DuplicateView, ExportView, ApiListView, ApiDetailView,
+    AsyncListView, AsyncDetailView,
 )
 
+from .fragments import invalidate_fragments, invalidate_related_fragments
+from .objects import ObjectCache
+from .search import SimpleSearchBackend
+from .shortcuts import UrlTemplates
+from .utils import (
+    compile_accessors, get_related_lookups, get_related_models, get_model_field,
+    get_attr_of_object, get_label_of_field,
+)
 from . import settings
 
 ALL_FIELDS = "__all__"
 
+URL_SUFFIXES = "list", "create", "update", "detail", "delete", "duplicate", "export"
+
+SitePlan = namedtuple("SitePlan", (
+    "info", "url_names", "lookup_field", "route_param",
+    "list_fields", "detail_fields", "detail_fieldsets", "labels",
+    "list_values", "list_instance_lookups", "digest",
+))
+
 
 class ModelSite:
     """Superclass that generate CRUD Views for any model"""
@@ -23,8 +50,9 @@ class ModelSite:
     fields = None # User for passed to Create and Update views for generate forms
     list_fields = ("__str__",) # Used for create ListView with de specified fields
     detail_fields = () # Used for create DetailView with specified fields
-    allow_views = "list", "create", "update", "detail", "delete" # Says Hydra which views create
+    allow_views = "list", "create", "update", "detail", "delete", "export", "api" # Says Hydra which views create
     success_url = "list"
+    use_async = False # Serves ListView and DetailView as async views, on the async ORM (Django 4.1+)
 
     # Templates
     list_template_name = None # Says Hydra which list template use
@@ -39,15 +67,31 @@ class ModelSite:
 
     # Prepopulate
     prepopulate_slug = ()
+    unique_slug = False # Appends -2, -3... to slugs that already exist
     
     # Options for build queryset
     queryset = None # Specified custom queryset
     paginate_by = None # Specified if ListView paginated by
+    pagination = "offset" # "offset" uses Django's Paginator, "keyset" pages with cursors over order_by plus pk
+    list_mode = "instances" # "values" reads list columns with values() and builds instances only for callable columns
+    list_select_related = () # Extra select_related lookups for ListView, False disables them
+    list_prefetch_related = () # Extra prefetch_related lookups for ListView, False disables them
 
     # Filter and ordering
     search_fields = () #Used for create searchs method by specified fields
+    search_backend_class = SimpleSearchBackend # Search engine used with search_fields
     order_by = () #User for crate ordering methods by specified fields
 
+    # Conditional GET
+    updated_field = None # Field touched on every save (e.g. auto_now), enables ETag and 304 on list and detail
+
+    # Fragment cache
+    fragment_cache = False # Caches the html of {% fragment %} blocks per object and user, invalidated when the object or a related model shown by the columns is saved or deleted
+
+    # Object cache
+    object_cache = False # Caches the objects opened by detail, update, delete and duplicate, by pk or slug
+    object_cache_timeout = None # Seconds, OBJECT_CACHE_TIMEOUT by default
+
     # Urls
     url_list_suffix = "list"
     url_create_suffix = "create"
@@ -55,6 +99,8 @@ class ModelSite:
     url_detail_suffix = "detail"
     url_delete_suffix = "delete"
     url_duplicate_suffix = "duplicate"
+    url_export_suffix = "export"
+    url_api_suffix = "api"
 
    
     def __init__(self, model, **kwargs):
@@ -65,15 +111,73 @@ class ModelSite:
         if not isinstance(self.allow_views, tuple):
             raise ImproperlyConfigured("The 'allow_views' attribute must be a tuple.")
 
+        if self.pagination not in ("offset", "keyset"):
+            raise ImproperlyConfigured("The 'pagination' attribute must be 'offset' or 'keyset'.")
+
+        if self.pagination == "keyset" and not self.paginate_by:
+            raise ImproperlyConfigured("The 'paginate_by' attribute must be specified for keyset pagination.")
+
+        if self.list_mode not in ("instances", "values"):
+            raise ImproperlyConfigured("The 'list_mode' attribute must be 'instances' or 'values'.")
+
+        if self.updated_field and get_model_field(model, self.updated_field) is None:
+            raise ImproperlyConfigured(f"Model '{model._meta.model_name}' has no field '{self.updated_field}'")
+
+        if self.use_async and django.VERSION < (4, 1):
+            raise ImproperlyConfigured("The 'use_async' attribute requires Django 4.1 or later.")
+
         if not self.form_class and not self.fields:
             self.fields = ALL_FIELDS
 
+        self.check_prepopulate_slug()
+
         self.breadcrumb_home_text = getattr(self, "breadcrumb_home_text", settings.BREADCRUMB_HOME_TEXT)
         self.breadcrumb_create_text = getattr(self, "breadcrumb_create_text", settings.BREADCRUMB_CREATE_TEXT)
         self.breadcrumb_update_text = getattr(self, "breadcrumb_update_text", settings.BREADCRUMB_UPDATE_TEXT)
         self.breadcrumb_detail_text = getattr(self, "breadcrumb_detail_text", settings.BREADCRUMB_DETAIL_TEXT)
         self.breadcrumb_delete_text = getattr(self, "breadcrumb_delete_text", settings.BREADCRUMB_DELETE_TEXT)
 
+        detail_fields = flatten(self.detail_fields) or [field.name for field in model._meta.fields]
+        self.list_accessors = compile_accessors(model, self.list_fields)
+        self.detail_accessors = compile_accessors(model, detail_fields)
+        self.list_related_lookups = self.get_list_related_lookups()
+        self.keyset_ordering = self.get_keyset_ordering()
+        self.search_backend = self.search_backend_class(self)
+        self.search_backend.connect()
+
+        if self.prepopulate_slug:
+            pre_save.connect(
+                self.populate_slug, sender=model,
+                dispatch_uid="hydra_prepopulate_slug_%s" % model._meta.label_lower
+            )
+
+        if self.fragment_cache:
+            dispatch_uid = "hydra_fragment_cache_%s" % model._meta.label_lower
+            post_save.connect(self.invalidate_fragments, sender=model, dispatch_uid=dispatch_uid)
+            post_delete.connect(self.invalidate_fragments, sender=model, dispatch_uid=dispatch_uid)
+
+        if self.fragment_cache or self.updated_field:
+            # The columns that cross a relation show rows of other models
+            related_models, throughs = get_related_models(model, [*self.list_fields, *detail_fields])
+            dispatch_uid = "hydra_related_rows_%s" % model._meta.label_lower
+            for related_model in related_models:
+                post_save.connect(self.invalidate_related_fragments, sender=related_model, dispatch_uid=dispatch_uid)
+                post_delete.connect(self.invalidate_related_fragments, sender=related_model, dispatch_uid=dispatch_uid)
+            for through in throughs:
+                m2m_changed.connect(self.invalidate_related_fragments, sender=through, dispatch_uid=dispatch_uid)
+
+        self.object_store = None
+        if self.object_cache:
+            self.object_store = ObjectCache(model, self.object_cache_timeout)
+            dispatch_uid = "hydra_object_cache_%s" % model._meta.label_lower
+            post_save.connect(self.object_store.invalidate, sender=model, dispatch_uid=dispatch_uid)
+            post_delete.connect(self.object_store.invalidate, sender=model, dispatch_uid=dispatch_uid)
+
+        self._views = {}
+        self._views_lock = threading.Lock()
+        self._url_templates = {}
+        self.plan = None
+
   
     def get_info(self):
         """Obtiene la información del modelo"""
@@ -81,17 +185,227 @@ class ModelSite:
         info = slugify(self.model._meta.app_config.verbose_name), slugify(self.model._meta.verbose_name)
         return info
 
+    def get_label(self, field):
+        try:
+            return get_label_of_field(self.model, field)
+        except (AttributeError, FieldDoesNotExist) as error:
+            raise ImproperlyConfigured(
+                f"Invalid field '{field}' in {self.__class__.__name__}: {error}"
+            )
+
+    def compile(self):
+        """
+        Congela en `plan` lo que las vistas leen en cada request: nombres de urls,
+        etiquetas, campos aplanados y el parámetro de la ruta. Los campos mal
+        configurados fallan aquí, al registrar el site, y no al renderizar.
+        """
+        info = self.get_info()
+        url_names = {
+            suffix: "%s_%s_%s" % (*info, getattr(self, "url_%s_suffix" % suffix))
+            for suffix in URL_SUFFIXES
+        }
+        url_names["api_list"] = "%s_%s_%s_list" % (*info, self.url_api_suffix)
+        url_names["api_detail"] = "%s_%s_%s_detail" % (*info, self.url_api_suffix)
+
+        has_slug = hasattr(self.model, "slug")
+        detail_fields = tuple(accessor.field for accessor in self.detail_accessors)
+
+        labels = {}
+        for field in (*self.list_fields, *detail_fields):
+            if field not in labels:
+                labels[field] = self.get_label(field)
+
+        detail_fieldsets = tuple(
+            (int(12 / len(fieldset)), tuple(fieldset))
+            if isinstance(fieldset, (list, tuple)) else (12, (fieldset,))
+            for fieldset in self.detail_fields
+        )
+
+        # Columns of the "values" list mode, the others are read from instances
+        list_values = ["pk", "slug" if has_slug else "pk"]
+        if self.pagination == "keyset":
+            list_values.extend(name.lstrip("-") for name in self.keyset_ordering)
+        list_values.extend(accessor.lookup for accessor in self.list_accessors if accessor.lookup)
+        if self.fragment_cache and self.updated_field:
+            list_values.append(self.updated_field)
+        instance_fields = [accessor.field for accessor in self.list_accessors if not accessor.lookup]
+
+        url_names = MappingProxyType(url_names)
+        list_values = tuple(dict.fromkeys(list_values))
+        digest = hashlib.sha256(repr((
+            self.list_fields, detail_fields, detail_fieldsets, sorted(url_names.items()), list_values,
+        )).encode()).hexdigest()[:16]
+
+        self.plan = SitePlan(
+            info=info,
+            url_names=url_names,
+            lookup_field="slug" if has_slug else "pk",
+            route_param="<slug:slug>" if has_slug else "<int:pk>",
+            list_fields=tuple(self.list_fields),
+            detail_fields=detail_fields,
+            detail_fieldsets=detail_fieldsets,
+            labels=MappingProxyType(labels),
+            list_values=list_values,
+            list_instance_lookups=(
+                get_related_lookups(self.model, instance_fields) if instance_fields else None
+            ),
+            digest=digest,
+        )
+        return self.plan
+
+    def get_list_related_lookups(self):
+        """
+        Calcula los select_related y prefetch_related de la ListView a partir de
+        list_fields, sumando los declarados en list_select_related y
+        list_prefetch_related. Con False se desactiva cada uno.
+        """
+        select_related, prefetch_related = get_related_lookups(self.model, self.list_fields)
+        if self.list_select_related is False:
+            select_related = ()
+        else:
+            select_related += tuple(
+                lookup for lookup in self.list_select_related if lookup not in select_related
+            )
+        if self.list_prefetch_related is False:
+            prefetch_related = ()
+        else:
+            prefetch_related += tuple(
+                lookup for lookup in self.list_prefetch_related if lookup not in prefetch_related
+            )
+        return select_related, prefetch_related
+
+    def get_keyset_ordering(self):
+        """
+        Orden estable para la paginación keyset: order_by (o el ordering del
+        modelo) terminado en la pk. Las claves foráneas se ordenan por su columna.
+        """
+        ordering = []
+        for name in self.order_by or self.model._meta.ordering:
+            if not isinstance(name, str) or name == "?":
+                continue
+            field_name = name.lstrip("-")
+            model_field = get_model_field(self.model, field_name)
+            if model_field is not None and model_field.is_relation and model_field.concrete:
+                name = name.replace(field_name, model_field.attname)
+            ordering.append(name)
+
+        pk = self.model._meta.pk
+        if not any(name.lstrip("-") in ("pk", pk.name, pk.attname) for name in ordering):
+            ordering.append("pk")
+        return tuple(ordering)
+
+    # Slug methods
+    def check_prepopulate_slug(self):
+        """Valida prepopulate_slug una sola vez, al registrar el site"""
+        slug_fields = self.prepopulate_slug
+        model_name = self.model._meta.model_name
+
+        if slug_fields and not isinstance(slug_fields, tuple):
+            raise ImproperlyConfigured("Field 'prepopulate_slug' must be a tuple")
+
+        if not slug_fields:
+            return
+
+        if not hasattr(self.model, "slug"):
+            raise ImproperlyConfigured(f"Model '{model_name}' has not 'slug' field")
+
+        for field in slug_fields:
+            if not hasattr(self.model, field):
+                raise ImproperlyConfigured(f"Model '{model_name}' has no field'{str(field)}'")
+
+        if self.unique_slug:
+            try:
+                self.model._meta.get_field("slug")
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"Model '{model_name}' needs a 'slug' field for unique_slug")
+
+    def populate_slug(self, sender, instance, **kwargs):
+        """Receptor de pre_save que arma el slug con los campos de prepopulate_slug"""
+        fields = (get_attr_of_object(instance, field) for field in self.prepopulate_slug)
+        slug = slugify(" ".join(fields))
+        if self.unique_slug:
+            slug = self.get_unique_slug(instance, slug)
+        instance.slug = slug
+
+    def get_unique_slug(self, instance, slug):
+        """
+        Retorna el slug libre, agregando -2, -3... si ya existe. Los slugs ocupados
+        se leen con una sola consulta: el slug y los que siguen a su base con un
+        guion, con cada base recortada que el sufijo obliga a usar.
+        """
+        max_length = self.model._meta.get_field("slug").max_length
+        if max_length:
+            slug = slug[:max_length]
+            # Suffixes up to -99999999
+            bases = dict.fromkeys(slug[:max(max_length - length, 0)] for length in range(2, 10))
+        else:
+            bases = [slug]
+        lookup = Q(slug=slug)
+        for base in bases:
+            lookup |= Q(slug__startswith=base + "-")
+
+        queryset = self.model._default_manager.filter(lookup)
+        if instance.pk is not None:
+            queryset = queryset.exclude(pk=instance.pk)
+        taken = set(queryset.values_list("slug", flat=True))
+
+        candidate, index = slug, 1
+        while candidate in taken:
+            index += 1
+            suffix = f"-{index}"
+            candidate = (slug[:max_length - len(suffix)] if max_length else slug) + suffix
+        return candidate
+
+    def invalidate_fragments(self, sender, instance, **kwargs):
+        """Receptor de post_save y post_delete con fragment_cache"""
+        invalidate_fragments(self.model, instance.pk)
+
+    def invalidate_related_fragments(self, sender, **kwargs):
+        """Receptor de los cambios de los modelos relacionados que muestran las columnas, con fragment_cache o updated_field"""
+        invalidate_related_fragments(self.model)
+
+    # View methods
+    def get_view(self, action, build):
+        """
+        Retorna la vista de la acción. La clase se compone con `build` una sola
+        vez por site y se reutiliza, salvo que CACHE_VIEW_CLASSES sea False.
+        """
+        if not settings.CACHE_VIEW_CLASSES:
+            return build().as_view()
+
+        view = self._views.get(action)
+        if view is None:
+            with self._views_lock:
+                view = self._views.get(action)
+                if view is None:
+                    view = build().as_view()
+                    self._views[action] = view
+        return view
+
     # Url methods
     def get_base_url_name(self, suffix):
-        info = self.get_info()
-        url_suffix = getattr(self, "url_%s_suffix" % suffix)
-        base_url_name = "%s_%s_%s" % (*info, url_suffix)
-        return base_url_name
+        if self.plan is None:
+            # Site sin registrar, aún sin compilar
+            return "%s_%s_%s" % (*self.get_info(), getattr(self, "url_%s_suffix" % suffix))
+        return self.plan.url_names[suffix]
 
     def get_url_name(self, suffix):
         url_name = "site:%s" % self.get_base_url_name(suffix)
         return url_name
 
+    def get_url_templates(self):
+        """Retorna las urls del site compiladas, una sola vez por urlconf"""
+        key = get_script_prefix(), get_urlconf()
+        url_templates = self._url_templates.get(key)
+        if url_templates is None:
+            url_templates = UrlTemplates(self)
+            self._url_templates[key] = url_templates
+        return url_templates
+
+    def clear_url_templates(self):
+        """Descarta las urls compiladas, p.ej. cuando cambian las rutas del site"""
+        self._url_templates.clear()
+
     def get_urls(self):
         """Genera las urls para los modelos registrados"""
 
@@ -102,8 +416,7 @@ class ModelSite:
         #     return update_wrapper(wrapper, view)
         urlpatterns = []
 
-        has_slug = hasattr(self.model, "slug")
-        route_param = "<slug:slug>" if has_slug else "<int:pk>"
+        route_param = self.plan.route_param
 
         if "list" in self.allow_views:
             #url_name = "%s_%s_%s" % (*info, self.url_list_suffix)
@@ -111,7 +424,7 @@ class ModelSite:
             urlpatterns += [
                 path(
                     route = "", 
-                    view = ListView.as_view(site=self), 
+                    view = (AsyncListView if self.use_async else ListView).as_view(site=self), 
                     name = url_name
                 )
             ]
@@ -127,6 +440,29 @@ class ModelSite:
                 ),
             ]
 
+        if "export" in self.allow_views:
+            urlpatterns += [
+                path(
+                    route = f"{self.url_export_suffix}/",
+                    view = ExportView.as_view(site=self),
+                    name = self.get_base_url_name("export"),
+                ),
+            ]
+
+        if "api" in self.allow_views:
+            urlpatterns += [
+                path(
+                    route = f"{self.url_api_suffix}/",
+                    view = ApiListView.as_view(site=self),
+                    name = self.get_base_url_name("api_list"),
+                ),
+                path(
+                    route = f"{route_param}/{self.url_api_suffix}/",
+                    view = ApiDetailView.as_view(site=self),
+                    name = self.get_base_url_name("api_detail"),
+                ),
+            ]
+
         if "update" in self.allow_views:
             url_update_name = self.get_base_url_name("update")
 
@@ -144,7 +480,7 @@ class ModelSite:
             urlpatterns += [
                 path(
                     route = f"{route_param}/{self.url_detail_suffix}/", 
-                    view = DetailView.as_view(site=self), 
+                    view = (AsyncDetailView if self.use_async else DetailView).as_view(site=self), 
                     name = url_detail_name
                 ),
             ]
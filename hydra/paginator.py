@@ -0,0 +1,171 @@
+"""Keyset pagination for list views"""
+
+# Python
+import base64
+import binascii
+import datetime
+import json
+import operator
+from collections.abc import Sequence
+from functools import reduce
+
+# Django
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Conserva los microsegundos, que DjangoJSONEncoder trunca"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<Keyset page of %s objects>" % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Pagina sobre un orden estable (los campos de `ordering` terminados en la pk)
+    filtrando a partir de los valores de la última fila vista, de modo que no
+    hace OFFSET ni COUNT. Los campos del orden no deben admitir nulos.
+    """
+
+    cursor_param = "cursor"
+
+    def __init__(self, queryset, per_page, ordering):
+        self.per_page = int(per_page)
+        self.queryset = queryset.order_by(*ordering)
+        self.fields = tuple(
+            (name.lstrip("-"), name.startswith("-")) for name in ordering
+        )
+        self.model_fields = tuple(
+            self.get_model_field(queryset.model, name) for name, descending in self.fields
+        )
+
+    @staticmethod
+    def get_model_field(model, name):
+        """Campo del modelo de `name`, o None si es una anotación"""
+        field = None
+        for attr in name.split("__"):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if attr == "pk" else model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field
+
+    def encode_cursor(self, reverse, values):
+        data = json.dumps([reverse, values], cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            reverse, values = json.loads(data.decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor("Invalid cursor: %s" % cursor)
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor("Invalid cursor: %s" % cursor)
+        return bool(reverse), self.clean_values(values, cursor)
+
+    def clean_values(self, values, cursor):
+        """Convierte los valores al tipo de su campo; un cursor alterado no llega a la consulta"""
+        cleaned = []
+        for field, value in zip(self.model_fields, values):
+            if value is None:
+                raise InvalidCursor("Invalid cursor: %s" % cursor)
+            if field is not None:
+                try:
+                    value = field.get_prep_value(field.to_python(value))
+                except (ValueError, TypeError, ValidationError):
+                    raise InvalidCursor("Invalid cursor: %s" % cursor)
+            cleaned.append(value)
+        return cleaned
+
+    def get_values(self, object):
+        values = []
+        for name, descending in self.fields:
+            if isinstance(object, dict):
+                values.append(object[name])
+                continue
+            value = object
+            for attr in name.split("__"):
+                value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def get_seek_filter(self, values, reverse):
+        conditions = []
+        equals = {}
+        for (name, descending), value in zip(self.fields, values):
+            lookup = "lt" if descending != reverse else "gt"
+            conditions.append(Q(**equals, **{f"{name}__{lookup}": value}))
+            equals[name] = value
+        return reduce(operator.__or__, conditions)
+
+    def get_page_queryset(self, cursor):
+        """Consulta de la página del cursor, con una fila extra para saber si hay más"""
+        reverse, values = self.decode_cursor(cursor) if cursor else (False, None)
+
+        queryset = self.queryset.reverse() if reverse else self.queryset
+        if values is not None:
+            queryset = queryset.filter(self.get_seek_filter(values, reverse))
+        return queryset[:self.per_page + 1], reverse, values
+
+    def get_page(self, cursor=None):
+        queryset, reverse, values = self.get_page_queryset(cursor)
+        return self.build_page(list(queryset), reverse, values)
+
+    async def aget_page(self, cursor=None):
+        queryset, reverse, values = self.get_page_queryset(cursor)
+        return self.build_page([object async for object in queryset], reverse, values)
+
+    def build_page(self, object_list, reverse, values):
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else values is not None
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(False, self.get_values(object_list[-1]))
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(True, self.get_values(object_list[0]))
+
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
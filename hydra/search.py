@@ -0,0 +1,310 @@
+"""Search backends for ModelSite.search_fields"""
+
+# Python
+import operator
+import re
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from functools import reduce
+
+# Django
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router, transaction
+from django.db.models import F, Q, IntegerField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+
+# Utils
+from .utils import get_model_field
+
+
+SearchTerm = namedtuple("SearchTerm", "text phrase exclude")
+
+TERMS_RE = re.compile(r'(-?)(?:"([^"]*)"|(\S+))')
+WORD_RE = re.compile(r"\w+")
+
+
+def parse_search_terms(value):
+    """
+    Separa el texto buscado en términos: palabras sueltas, frases entre comillas
+    dobles y términos excluidos con un guión delante, p.ej. `factura "san juan" -anulada`
+    """
+    terms = []
+    for exclude, phrase, word in TERMS_RE.findall(value):
+        text = phrase or word
+        if WORD_RE.search(text):
+            terms.append(SearchTerm(text, bool(phrase), bool(exclude)))
+    return terms
+
+
+class SearchBackend(ABC):
+    """Interfaz de los motores de búsqueda de un ModelSite"""
+
+    def __init__(self, site):
+        self.site = site
+        self.model = site.model
+
+    @abstractmethod
+    def search(self, queryset, value):
+        """Retorna el queryset filtrado, y ordenado si aplica, por el texto buscado"""
+
+    def connect(self):
+        """Conecta las señales que mantienen el índice, si el motor usa uno"""
+        pass
+
+    def rebuild_index(self, using=None):
+        """Crea y llena el índice con las filas existentes, si el motor usa uno"""
+        pass
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Une con OR un Q(field=value) por cada entrada de search_fields"""
+
+    def get_params(self, value):
+        args = []
+        for field in self.site.search_fields:
+            args.append(Q(**{field: value}))
+
+        return reduce(operator.__or__, args)
+
+    def search(self, queryset, value):
+        if not self.site.search_fields:
+            return queryset
+        return queryset.filter(self.get_params(value))
+
+
+class FullTextSearchBackend(SearchBackend):
+    """
+    Búsqueda de texto completo ordenada por relevancia sobre los campos de
+    search_fields (sin el lookup final, p.ej. `name__icontains` indexa `name`).
+
+    En PostgreSQL usa tsvector: si `vector_field` nombra un SearchVectorField
+    del modelo (con su GinIndex) se consulta y mantiene esa columna, si no el
+    vector se calcula en la consulta. En SQLite usa una tabla virtual FTS5
+    `<db_table>_fts` indexada por la pk, que crea y llena el comando
+    `rebuildsearchindex`. En otras bases de datos se busca cada término con icontains.
+    """
+
+    vector_field = None # SearchVectorField kept up to date on PostgreSQL
+    config = None # Text search configuration on PostgreSQL
+    tokenize = "unicode61 remove_diacritics 2" # FTS5 tokenizer on SQLite
+    chunk_size = 2000 # Rows read and indexed at a time by rebuild_index
+
+    def __init__(self, site):
+        super().__init__(site)
+        self.fields = tuple(self.get_field_path(field) for field in site.search_fields)
+        if not self.fields:
+            raise ImproperlyConfigured(
+                "The 'search_fields' attribute must be specified for full text search."
+            )
+        self.fts_table = "%s_fts" % self.model._meta.db_table
+        self._fts_ready = set()
+
+    def get_field_path(self, field):
+        """Quita el lookup final de una entrada de search_fields"""
+        names = field.split("__")
+        model = self.model
+        path = []
+        for name in names:
+            model_field = get_model_field(model, name)
+            if model_field is None:
+                break
+            path.append(name)
+            model = model_field.related_model
+        return "__".join(path)
+
+    def get_vendor(self, alias):
+        return connections[alias].vendor
+
+    # Search
+    def search(self, queryset, value):
+        terms = parse_search_terms(value)
+        if not terms:
+            return queryset
+
+        vendor = self.get_vendor(queryset.db)
+        if vendor == "postgresql":
+            return self.search_postgresql(queryset, terms)
+        if vendor == "sqlite":
+            return self.search_sqlite(queryset, terms)
+        return self.search_fallback(queryset, terms)
+
+    def search_postgresql(self, queryset, terms):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        queries = []
+        for term in terms:
+            if term.phrase:
+                query = SearchQuery(term.text, search_type="phrase", config=self.config)
+            else:
+                prefixes = " & ".join("%s:*" % word for word in WORD_RE.findall(term.text))
+                query = SearchQuery(prefixes, search_type="raw", config=self.config)
+            queries.append(~query if term.exclude else query)
+        query = reduce(operator.__and__, queries)
+
+        vector_field = self.vector_field
+        if not vector_field:
+            vector_field = "search_vector"
+            queryset = queryset.annotate(search_vector=SearchVector(*self.fields, config=self.config))
+
+        return queryset.filter(**{vector_field: query}).annotate(
+            search_rank=SearchRank(F(vector_field), query)
+        ).order_by("-search_rank")
+
+    def get_match(self, terms):
+        """Expresión MATCH de FTS5 con los términos, que van siempre entre comillas"""
+        expressions = []
+        for term in terms:
+            text = '"%s"' % term.text.replace('"', '""')
+            expressions.append(text if term.phrase else text + "*")
+        return " AND ".join(expressions)
+
+    def search_sqlite(self, queryset, terms):
+        if not self.has_fts_table(queryset.db):
+            raise ImproperlyConfigured(
+                "The full text index of '%s' does not exist, run the rebuildsearchindex command."
+                % self.model._meta.label
+            )
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(self.fts_table)
+        include = [term for term in terms if not term.exclude]
+        exclude = [term for term in terms if term.exclude]
+
+        if exclude:
+            queryset = queryset.exclude(pk__in=RawSQL(
+                "SELECT rowid FROM %s WHERE %s MATCH %%s" % (table, table),
+                (self.get_match(exclude),)
+            ))
+        if not include:
+            return queryset
+
+        match = self.get_match(include)
+        pk_column = "%s.%s" % (
+            connection.ops.quote_name(self.model._meta.db_table),
+            connection.ops.quote_name(self.model._meta.pk.column),
+        )
+        return queryset.filter(pk__in=RawSQL(
+            "SELECT rowid FROM %s WHERE %s MATCH %%s" % (table, table), (match,)
+        )).annotate(search_rank=RawSQL(
+            "SELECT rank FROM %s WHERE %s MATCH %%s AND rowid = %s" % (table, table, pk_column),
+            (match,)
+        )).order_by("search_rank")
+
+    def search_fallback(self, queryset, terms):
+        for term in terms:
+            params = reduce(operator.__or__, (
+                Q(**{"%s__icontains" % field: term.text}) for field in self.fields
+            ))
+            queryset = queryset.exclude(params) if term.exclude else queryset.filter(params)
+        return queryset
+
+    # Index
+    def connect(self):
+        uid = "hydra_search_index_%s" % self.model._meta.label_lower
+        post_save.connect(self.post_save, sender=self.model, dispatch_uid=uid)
+        post_delete.connect(self.post_delete, sender=self.model, dispatch_uid=uid)
+
+    def post_save(self, sender, instance, raw=False, using=None, **kwargs):
+        if not raw:
+            self.update_index(instance, using)
+
+    def post_delete(self, sender, instance, using=None, **kwargs):
+        self.remove_index(instance, using)
+
+    def get_document(self, instance):
+        """Valores de texto de los campos buscables de la instancia"""
+        values = []
+        for field in self.fields:
+            value = instance
+            for name in field.split("__"):
+                value = getattr(value, name, None) if value is not None else None
+            values.append("" if value is None else str(value))
+        return values
+
+    def update_index(self, instance, using=None):
+        using = using or router.db_for_write(self.model, instance=instance)
+        vendor = self.get_vendor(using)
+        if vendor == "postgresql" and self.vector_field:
+            from django.contrib.postgres.search import SearchVector
+            self.model._default_manager.using(using).filter(pk=instance.pk).update(**{
+                self.vector_field: SearchVector(*self.fields, config=self.config)
+            })
+        elif vendor == "sqlite" and self.has_fts_table(using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    "DELETE FROM %s WHERE rowid = %%s" % connections[using].ops.quote_name(self.fts_table),
+                    (instance.pk,)
+                )
+                self.insert_documents(cursor, using, [instance])
+
+    def remove_index(self, instance, using=None):
+        using = using or router.db_for_write(self.model, instance=instance)
+        if self.get_vendor(using) == "sqlite" and self.has_fts_table(using):
+            table = connections[using].ops.quote_name(self.fts_table)
+            with connections[using].cursor() as cursor:
+                cursor.execute("DELETE FROM %s WHERE rowid = %%s" % table, (instance.pk,))
+
+    def rebuild_index(self, using=None):
+        """Reconstruye el índice completo a partir de las filas existentes"""
+        using = using or router.db_for_write(self.model)
+        vendor = self.get_vendor(using)
+        if vendor == "postgresql" and self.vector_field:
+            from django.contrib.postgres.search import SearchVector
+            self.model._default_manager.using(using).update(**{
+                self.vector_field: SearchVector(*self.fields, config=self.config)
+            })
+        elif vendor == "sqlite":
+            self.create_fts_table(using)
+            queryset = self.model._default_manager.using(using).all()
+            with transaction.atomic(using=using), connections[using].cursor() as cursor:
+                cursor.execute("DELETE FROM %s" % connections[using].ops.quote_name(self.fts_table))
+                instances = []
+                for instance in queryset.iterator(chunk_size=self.chunk_size):
+                    instances.append(instance)
+                    if len(instances) == self.chunk_size:
+                        self.insert_documents(cursor, using, instances)
+                        instances = []
+                self.insert_documents(cursor, using, instances)
+
+    def insert_documents(self, cursor, using, instances):
+        if not instances:
+            return
+        cursor.executemany(
+            "INSERT INTO %s (rowid, %s) VALUES (%%s, %s)" % (
+                connections[using].ops.quote_name(self.fts_table),
+                ", ".join(self.get_fts_columns(using)),
+                ", ".join(["%s"] * len(self.fields)),
+            ),
+            [(instance.pk, *self.get_document(instance)) for instance in instances]
+        )
+
+    def get_fts_columns(self, using):
+        quote_name = connections[using].ops.quote_name
+        return [quote_name(field) for field in self.fields]
+
+    def has_fts_table(self, using):
+        """Si la tabla FTS5 existe; se recuerda por proceso una vez encontrada"""
+        if using not in self._fts_ready:
+            connection = connections[using]
+            with connection.cursor() as cursor:
+                if self.fts_table in connection.introspection.table_names(cursor):
+                    self._fts_ready.add(using)
+        return using in self._fts_ready
+
+    def create_fts_table(self, using):
+        """DDL de la tabla FTS5, la ejecuta rebuild_index y nunca una petición"""
+        pk = self.model._meta.pk
+        pk = pk.target_field if pk.is_relation else pk
+        if not isinstance(pk, IntegerField):
+            raise ImproperlyConfigured(
+                "Full text search on SQLite requires an integer primary key in '%s'."
+                % self.model._meta.label
+            )
+        quote_name = connections[using].ops.quote_name
+        with connections[using].cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s, tokenize=%s)" % (
+                quote_name(self.fts_table),
+                ", ".join(self.get_fts_columns(using)),
+                "'%s'" % self.tokenize,
+            ))
+        self._fts_ready.add(using)
@@ -9,4 +9,22 @@ BREADCRUMB_DELETE_TEXT = getattr(settings, "BREADCRUMB_DELETE_TEXT", "delete")
 BOOLEAN_YES = getattr(settings, "BOOLEAN_YES", "Yes")
 BOOLEAN_NO = getattr(settings, "BOOLEAN_NO", "No")
 
-TEMPLATE_WIDGETS = getattr(settings, "TEMPLATE_WIDGETS", {})
\ No newline at end of file
+TEMPLATE_WIDGETS = getattr(settings, "TEMPLATE_WIDGETS", {})
+
+CACHE_VIEW_CLASSES = getattr(settings, "CACHE_VIEW_CLASSES", True)
+
+CACHE_ALIAS = getattr(settings, "CACHE_ALIAS", "default")
+MENU_CACHE_TIMEOUT = getattr(settings, "MENU_CACHE_TIMEOUT", 60 * 60)
+# Lifetime of the menus held by each process when the cache is not shared (LocMemCache)
+MENU_LOCAL_TIMEOUT = getattr(settings, "MENU_LOCAL_TIMEOUT", 60)
+
+# Written by the snapshotroutes command, used to build the urls whenever the file exists
+ROUTES_SNAPSHOT = getattr(settings, "ROUTES_SNAPSHOT", None)
+
+EXPORT_CHUNK_SIZE = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 60 * 60 * 24)
+# Part of every {% fragment %} name: change it on deploys that change templates included by the blocks
+FRAGMENT_CACHE_VERSION = getattr(settings, "FRAGMENT_CACHE_VERSION", "")
+
+OBJECT_CACHE_TIMEOUT = getattr(settings, "OBJECT_CACHE_TIMEOUT", 60 * 5)
@@ -1,12 +1,18 @@
 # Python
 import inspect
+import logging
+import re
 
 # Django
 from django.views.generic import View
 from django.urls import reverse, NoReverseMatch
+from django.urls.converters import get_converter
 from django.apps import apps
 
 
+logger = logging.getLogger(__name__)
+
+
 def get_slug_or_pk(object):
     res = dict()
     if object:
@@ -19,34 +25,81 @@ def get_slug_or_pk(object):
 
 
 def get_object(model_class, slug_or_pk):
+    from hydra import site
+
     search_field = "slug" if hasattr(model_class, "slug") else "pk"
+    model_site = site._registry.get(model_class)
     try:
-        object = model_class.objects.get(**{search_field: slug_or_pk})
+        if model_site is not None and model_site.object_cache:
+            # The cache keys use the value as the urls convert it
+            value = int(slug_or_pk) if search_field == "pk" else slug_or_pk
+            object = model_site.object_store.get(model_class.objects.all(), search_field, value)
+        else:
+            object = model_class.objects.get(**{search_field: slug_or_pk})
     except model_class.DoesNotExist:
         object = None
     return object
 
 
-def get_urls_of_site(site, object=None):
-    urls = {}
-    kwargs = get_slug_or_pk(object)
+class UrlTemplates:
+    """
+    Rutas de un site revertidas una sola vez. Las rutas de objeto guardan un
+    valor de relleno en lugar del slug o pk, que se sustituye para cada objeto.
+    """
+
+    site_actions = ("list", "create", "export", "api_list")
+    object_actions = ("update", "detail", "delete", "duplicate", "api_detail")
+    views = {"api_list": "api", "api_detail": "api"} # Entry of allow_views for each action
+    placeholders = {
+        "slug": ("slug", "hydra-slug-placeholder"),
+        "pk": ("int", "918273645546372819"),
+    }
+
+    def __init__(self, site):
+        param = site.plan.lookup_field
+        converter, placeholder = self.placeholders[param]
+        self.regex = re.compile(get_converter(converter).regex)
+
+        self.site_urls = {}
+        for action in self.site_actions:
+            if self.views.get(action, action) not in site.allow_views:
+                continue
+            url = self.reverse(site.get_url_name(action))
+            if url is not None:
+                self.site_urls[action] = url
+
+        self.object_urls = {}
+        for action in self.object_actions:
+            if action in self.views and self.views[action] not in site.allow_views:
+                continue
+            url = self.reverse(site.get_url_name(action), {param: placeholder})
+            if url is not None:
+                self.object_urls[action] = url.split(placeholder)
 
-    for action in ("list", "create"):
+    def reverse(self, url_name, kwargs=None):
         try:
-            url_name = site.get_url_name(action)
-            urls.update({action: reverse(url_name)})
+            return reverse(url_name, kwargs=kwargs)
         except NoReverseMatch:
-            print("Url not found: %s" % url_name)
-    
-    if not kwargs:
-        return urls
+            logger.warning("Url not found: %s", url_name)
 
-    for action in ("update", "detail", "delete", "duplicate"):
-        try:
-            url_name = site.get_url_name(action)
+    def get_urls(self, slug_or_pk=None):
+        """Retorna las urls del site, y las del objeto si se pasa su slug o pk"""
+        urls = dict(self.site_urls)
+        if slug_or_pk is None:
+            return urls
 
-            urls.update({action: reverse(url_name, kwargs=kwargs)})
-        except NoReverseMatch:
-            print("Url not found: %s" % url_name)
+        value = str(slug_or_pk)
+        if not self.regex.fullmatch(value):
+            return urls
+
+        for action, parts in self.object_urls.items():
+            urls[action] = value.join(parts)
 
-    return urls
+        return urls
+
+
+def get_urls_of_site(site, object=None):
+    url_templates = site.get_url_templates()
+    if not object:
+        return url_templates.get_urls()
+    return url_templates.get_urls(getattr(object, site.plan.lookup_field))
@@ -1,78 +1,111 @@
 """ Hydra signals """
 
 # Django
-from django.core.exceptions import ImproperlyConfigured
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import transaction
 from django.dispatch import receiver
-from django.utils.text import slugify
+from django.utils.autoreload import file_changed
 from django.apps import apps
 
-# Hydra
-from hydra import site
-
 # Models
-from hydra.models import Menu
+from hydra.models import Action, Menu
+
+# Menus
+from hydra.menus import update_subtree_routes, update_groups, menu_signals_suspended
 
 # Utils
-from hydra.utils import get_attr_of_object
+from hydra.utils import clear_class_index
+from hydra.cache import bump_version
+from hydra.management.commands.createactions import clear_elements_catalog
 #from hydra.shortcuts import get_actions_and_elements
 
 
-""" Signal for presave instance """
+@receiver(pre_save, sender=Menu)
+def add_route(sender, instance, **kwargs):
+    if menu_signals_suspended():
+        return
+    instance.route = instance.get_route()
+    instance.depth = instance.get_depth()
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Menu.objects.filter(pk=instance.pk).values(
+            "route", "depth", "parent_id"
+        ).first()
 
-@receiver(pre_save)
-def prepopulate_slug(sender, instance, **kwargs):
-    if not site.is_registered(sender):
+@receiver(post_save, sender=Menu)
+def check(sender, instance, **kwargs):
+    if menu_signals_suspended():
         return
+    previous = getattr(instance, "_previous_state", None)
+    pks = {instance.pk, instance.parent_id}
+
+    with transaction.atomic():
+        if previous:
+            pks.add(previous["parent_id"])
+            if previous["route"] != instance.route:
+                update_subtree_routes(
+                    previous["route"], instance.route, instance.depth - previous["depth"]
+                )
+        groups = update_groups(pks)
+
+    instance.is_group = instance.pk in groups
+
+@receiver(post_delete, sender=Menu)
+def check_parent(sender, instance, **kwargs):
+    if menu_signals_suspended():
+        return
+    update_groups({instance.parent_id})
+
 
-    model_site = site.get_modelsite(sender)
-    model_name = sender._meta.model_name
+def bump_version_on_commit(name, using=None):
+    """
+    Incrementa la versión y la repite al confirmar la transacción, por si otra
+    request cacheó los menús o las urls anteriores mientras seguía abierta.
+    """
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name), using=using)
 
-    slug_fields = model_site.prepopulate_slug
 
-    if slug_fields and not isinstance(slug_fields, tuple):
-        raise ImproperlyConfigured("Field 'prepopulate_slug' must be a tuple")
+""" Signals for invalidate cached menus """
 
-    if not slug_fields:
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+@receiver(post_save, sender=Action)
+@receiver(post_delete, sender=Action)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Action.permissions.through)
+def invalidate_menus(sender, using=None, **kwargs):
+    if menu_signals_suspended():
         return
+    bump_version_on_commit("menu", using)
 
-    if not hasattr(sender, "slug"):
-        raise ImproperlyConfigured(f"Model '{model_name}' has not 'slug' field")
 
-    for field in slug_fields:
-        if not hasattr(sender, field):
-            raise ImproperlyConfigured(f"Model '{model_name}' has no field'{str(field)}'")
+User = get_user_model()
+if hasattr(User, "groups"):
+    m2m_changed.connect(
+        invalidate_menus, sender=User.groups.through, dispatch_uid="hydra_invalidate_menus_groups"
+    )
 
-    
-    fields = (get_attr_of_object(instance, field) for field in slug_fields)
-    slug = " ".join(fields)
-    instance.slug = slugify(slug)
 
-@receiver(pre_save, sender=Menu)
-def add_route(sender, instance, **kwargs):
-    instance.route = instance.get_route()
+""" Signals for reload site urls """
 
 @receiver(post_save, sender=Menu)
-def check(sender, instance, **kwargs):
-
-    post_save.disconnect(check, sender=Menu)
-    pre_save.disconnect(add_route, sender=Menu)
-
-    def update_route(menu):
-        menu.route = menu.get_route()
-        menu.save()
-        for submenu in menu.submenus.all():
-            update_route(submenu)
-        
-    def update_groups():
-        for menu in Menu.objects.all():
-            menu.is_group = bool(menu.submenus.count())
-            menu.save()
-
-    update_route(instance)
-    update_groups()
+@receiver(post_delete, sender=Menu)
+@receiver(post_save, sender=Action)
+@receiver(post_delete, sender=Action)
+@receiver(m2m_changed, sender=Action.permissions.through)
+def invalidate_urls(sender, using=None, **kwargs):
+    if menu_signals_suspended():
+        return
+    bump_version_on_commit("urls", using)
 
-    post_save.connect(check, sender=Menu)
-    pre_save.connect(add_route, sender=Menu)
 
+""" Signal for autoreload """
 
+@receiver(file_changed)
+def clear_caches(sender, file_path, **kwargs):
+    clear_class_index()
+    clear_elements_catalog()
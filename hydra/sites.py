@@ -1,14 +1,21 @@
 """Classes and functios for register site models"""
 
+# Python
+import threading
+import time
+
 # Django
 from django.utils.text import slugify
 from django.core.exceptions import ImproperlyConfigured
 from django.db.models.base import ModelBase
 from django.db import connection
-from django.urls import path, include 
+from django.urls import URLResolver, path, include, get_resolver
 from django.apps import apps
 
 from .utils import import_mixins
+from .snapshot import load_snapshot
+from .cache import get_version, is_shared_cache
+from . import settings
 
 
 class Site:
@@ -17,6 +24,10 @@ class Site:
     def __init__(self, name="site"):
         self._registry = {}
         self.name = name
+        self._urlpatterns = None
+        self._urls_version = None
+        self._urls_loaded_at = None
+        self._urls_lock = threading.Lock()
 
     def register(self, model, site_class):
         """Registra las clases en el auto site"""
@@ -42,7 +53,17 @@ class Site:
         if model in self._registry:
             raise Exception('The model %s is already registered' % model.__name__)
 
-        self._registry[model] = site_class(model)
+        model_site = site_class(model)
+        model_site.compile()
+        self._registry[model] = model_site
+
+    def get_object_cache_stats(self):
+        """Aciertos, fallos y lecturas directas de la caché de objetos, por modelo, en este proceso"""
+        return {
+            model._meta.label_lower: model_site.object_store.stats()
+            for model, model_site in self._registry.items()
+            if model_site.object_cache
+        }
 
     def is_registered(self, model):
         """
@@ -79,7 +100,10 @@ class Site:
         if PermissionRequiredMixin not in view.__bases__:
             view.__bases__ = (PermissionRequiredMixin, *mixins, *view.__bases__)
         
-        view.permission_required = menu.action.get_permissions()
+        permissions = getattr(menu.action, "permission_required", None)
+        if permissions is None:
+            permissions = menu.action.get_permissions()
+        view.permission_required = permissions
         if view:
             urlpatterns = [
                 path(
@@ -105,13 +129,17 @@ class Site:
         try:
             Menu = apps.get_model("hydra", "Menu")
             if Menu._meta.db_table in connection.introspection.table_names():
-                menus = Menu.objects.all()
+                menus = Menu.objects.select_related("action").prefetch_related("action__permissions")
         except LookupError as error:
             print(error)
             menus = None
         return menus
 
-    def get_urls(self):
+    def get_snapshot_menus(self):
+        """Menús del snapshot de rutas, sin consultar la base de datos"""
+        return load_snapshot(settings.ROUTES_SNAPSHOT, self._urls_version)
+
+    def get_urls(self, snapshot=True):
         """Obtiene las urls de auto site"""
 
         # def wrap(view, cacheable=False):
@@ -121,22 +149,87 @@ class Site:
         #       return update_wrapper(wrapper, view)
 
         urlpatterns = []
-        menus = self.get_menus()
+        menus = self.get_snapshot_menus() if snapshot else None
+        if menus is None:
+            menus = self.get_menus()
         if menus:
             for menu in menus:
                 urlpatterns.extend(self.get_menu_urls(menu))
         else:
             for model, model_site in self._registry.items():
-                info = model_site.get_info()
+                info = model_site.plan.info
                 url_format = "%s/%s/" % info
                 urlpatterns += [path(url_format, include(model_site.urls))]
 
         return urlpatterns
 
+    def urls_stale(self, version):
+        if version != self._urls_version:
+            return True
+        # Sin caché compartida la versión solo cambia con los guardados de este proceso
+        if not is_shared_cache():
+            return time.monotonic() - self._urls_loaded_at > settings.MENU_LOCAL_TIMEOUT
+        return False
+
+    def get_site_resolvers(self, resolver):
+        """Resolvers del urlconf que incluyen las urls de este site"""
+        for pattern in resolver.url_patterns:
+            if not isinstance(pattern, URLResolver):
+                continue
+            if pattern.urlconf_name is self._urlpatterns:
+                yield pattern
+            else:
+                yield from self.get_site_resolvers(pattern)
+
+    @staticmethod
+    def swap_resolver_urls(resolver, urlpatterns):
+        """Cambia las urls del resolver y descarta solo sus índices de reverse"""
+        resolver.urlconf_name = urlpatterns
+        resolver.__dict__["urlconf_module"] = urlpatterns
+        resolver.__dict__["url_patterns"] = urlpatterns
+        resolver._reverse_dict = {}
+        resolver._namespace_dict = {}
+        resolver._app_dict = {}
+        resolver._callback_strs = set()
+        resolver._populated = False
+
+    def check_urls(self, urlconf=None):
+        """
+        Vuelve a generar las urls del site si cambió la versión compartida de las
+        rutas, o si vencieron cuando la caché no es compartida. La nueva lista de
+        urls se arma aparte y reemplaza a la anterior en el include del site, cuyo
+        resolver es el único que se descarta; las peticiones en curso siguen
+        recorriendo la lista anterior, que no se modifica.
+        """
+        if self._urlpatterns is None:
+            return
+
+        version = get_version("urls")
+        if not self.urls_stale(version):
+            return
+
+        with self._urls_lock:
+            if not self.urls_stale(version):
+                return
+            urlpatterns = self.get_urls(snapshot=False)
+            resolvers = list(self.get_site_resolvers(get_resolver(urlconf)))
+            self._urlpatterns = urlpatterns
+            for resolver in resolvers:
+                self.swap_resolver_urls(resolver, urlpatterns)
+            self._urls_version = version
+            self._urls_loaded_at = time.monotonic()
+
+            for model_site in self._registry.values():
+                model_site.clear_url_templates()
+
     @property
     def urls(self):
         """Permite registrar las URLs en el archivo de urls del proyecto"""
-        return self.get_urls(), 'site', self.name
+        if self._urlpatterns is None:
+            self._urls_version = get_version("urls")
+            self._urls_loaded_at = time.monotonic()
+            self._urlpatterns = self.get_urls()
+        return self._urlpatterns, 'site', self.name
 
 
 site = Site()
@@ -0,0 +1,110 @@
+"""Snapshot of the menu routes used to build the site urls"""
+
+# Python
+import json
+import logging
+import os
+
+# Django
+from django.apps import apps
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+
+
+def serialize_menu(menu):
+    action = menu.action
+    return {
+        "id": menu.pk,
+        "parent": menu.parent_id,
+        "name": menu.name,
+        "route": menu.route,
+        "depth": menu.depth,
+        "sequence": menu.sequence,
+        "is_group": menu.is_group,
+        "is_active": menu.is_active,
+        "icon_class": menu.icon_class,
+        "action": {
+            "id": action.pk,
+            "to": action.to,
+            "app_label": action.app_label,
+            "name": action.name,
+            "element": action.element,
+            "permissions": action.get_permissions(),
+        },
+    }
+
+
+def dump_snapshot(menus, path, urls_version):
+    """
+    Escribe las rutas de los menús en `path`, reemplazando el archivo de forma
+    atómica. `urls_version` es la versión compartida de las rutas leída antes
+    que los menús.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "urls_version": urls_version,
+        "menus": [serialize_menu(menu) for menu in menus],
+    }
+    tmp_path = "%s.tmp" % path
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return len(data["menus"])
+
+
+def load_snapshot(path, urls_version):
+    """
+    Retorna los menús del snapshot como instancias sin guardar, con su acción y
+    los permisos de la acción en `action.permission_required`. Retorna None si
+    el archivo no existe o es de otro formato. Si su versión de las rutas no es
+    `urls_version` solo se advierte: con una caché local las versiones nunca
+    coinciden, y las urls se regeneran con el siguiente cambio de los menús.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    if data.get("version") != SNAPSHOT_VERSION:
+        logger.warning(
+            "Ignoring routes snapshot %s with version %s, expected %s",
+            path, data.get("version"), SNAPSHOT_VERSION
+        )
+        return None
+
+    if urls_version is None or data.get("urls_version") != urls_version:
+        logger.warning(
+            "The routes snapshot %s may be outdated, the routes version changed after it was written", path
+        )
+
+    Action = apps.get_model("hydra", "Action")
+    Menu = apps.get_model("hydra", "Menu")
+
+    actions = {}
+    menus = []
+    for entry in data["menus"]:
+        entry = dict(entry)
+        action_data = dict(entry.pop("action"))
+        action = actions.get(action_data["id"])
+        if action is None:
+            permissions = action_data.pop("permissions")
+            action = Action(**action_data)
+            action.permission_required = permissions
+            actions[action.pk] = action
+        menus.append(Menu(
+            id=entry["id"],
+            parent_id=entry["parent"],
+            name=entry["name"],
+            route=entry["route"],
+            depth=entry["depth"],
+            sequence=entry["sequence"],
+            is_group=entry["is_group"],
+            is_active=entry["is_active"],
+            icon_class=entry["icon_class"],
+            action=action,
+        ))
+    return menus
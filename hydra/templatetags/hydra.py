@@ -1,5 +1,6 @@
 # Python
 from copy import copy
+import hashlib
 import json
 import types
 import re
@@ -25,6 +26,7 @@ from django.template.base import (
     TemplateSyntaxError,
     VariableDoesNotExist,
 )
+from django.template.defaulttags import CsrfTokenNode
 
 # Exceptions
 from django.template.exceptions import TemplateDoesNotExist
@@ -240,6 +242,53 @@ def render_field(parser, token):
     return FieldNode(form_field, attrs)
 
 
+@register.tag
+def fragment(parser, token):
+    """
+    Cachea el html del bloque con la clave del fragmento de la fila o del detalle:
+    {% fragment row.fragment %}...{% endfragment %}. Sin fragment_cache en el
+    site, el bloque se renderiza siempre. El bloque no puede tener contenido que
+    cambia en cada request, como {% csrf_token %}.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise TemplateSyntaxError("'%s' tag requires one argument" % bits[0])
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    if nodelist.get_nodes_by_type(CsrfTokenNode):
+        raise TemplateSyntaxError("'%s' tag can't contain {%% csrf_token %%}, it changes on every request" % bits[0])
+
+    # Blocks of other templates, or other blocks of the same template, are cached
+    # apart, and a change of the block markup discards its html
+    template_name = getattr(parser.origin, "template_name", None) or ""
+    source = [
+        (node.token.token_type.value, node.token.contents)
+        for node in nodelist.get_nodes_by_type(Node) if getattr(node, "token", None)
+    ]
+    name = hashlib.sha256(repr(
+        (template_name, token.lineno, source, settings.FRAGMENT_CACHE_VERSION)
+    ).encode()).hexdigest()[:16]
+    return FragmentNode(nodelist, parser.compile_filter(bits[1]), name)
+
+
+class FragmentNode(Node):
+    def __init__(self, nodelist, fragment, name):
+        self.nodelist = nodelist
+        self.fragment = fragment
+        self.name = name
+
+    def render(self, context):
+        fragment = self.fragment.resolve(context, ignore_failures=True)
+        if fragment is None:
+            return self.nodelist.render(context)
+
+        content = fragment.get(self.name)
+        if content is None:
+            content = self.nodelist.render(context)
+            fragment.set(self.name, str(content))
+        return mark_safe(content)
+
+
 class FieldNode(Node):
     def __init__(self, field, attrs):
         """
@@ -1,22 +1,30 @@
 #Python
 import inspect
+from functools import partialmethod
 from importlib import import_module
 
 # Django
 from django.core.exceptions import FieldDoesNotExist
 from django.forms.utils import pretty_name
+from django.utils.encoding import force_str
+from django.utils.functional import keep_lazy_text
+from django.utils.hashable import make_hashable
 from django.utils.html import format_html
 
 from hydra import settings
 
 
+# Keeps lazy verbose names lazy, so labels computed at startup follow the active language
+pretty_label = keep_lazy_text(pretty_name)
+
+
 def get_label_of_field(model, field):
     names = field.split(".")
     name = names.pop(0)
 
     try:
         name, verbose_name = name.split(":")
-        return pretty_name(verbose_name)
+        return pretty_label(verbose_name)
     except ValueError:
         pass
 
@@ -41,9 +49,9 @@ def get_label_of_field(model, field):
         field = model._meta.get_field(name)
         label = field.verbose_name if hasattr(field, "verbose_name") else name
     except FieldDoesNotExist:
-        label = str(model._meta.verbose_name) if name == "__str__" else name
+        label = model._meta.verbose_name if name == "__str__" else name
 
-    return pretty_name(label)
+    return pretty_label(label)
 
 
 def get_attr_of_object(instance, field):
@@ -77,18 +85,215 @@ def get_attr_of_object(instance, field):
     return attr
 
 
-def import_class(module_name, class_name):
-    cls = None
+def get_model_field(model, name):
+    if not hasattr(model, "_meta"):
+        return None
     try:
-        module = import_module(module_name)
-        members = inspect.getmembers(module, inspect.isclass)
-        for name, klass in members:
-            if name == class_name:
-                cls = klass
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+class FieldAccessor:
+    """
+    Accesor precompilado de un campo de list_fields o detail_fields. La ruta de
+    atributos, el mapa de choices y el html de los booleanos se resuelven una
+    sola vez, al configurar el site. Si el campo es una columna alcanzable por
+    claves foráneas, `lookup` es su nombre para values() y `format` formatea
+    el valor leído sin instancia; si no, `lookup` es None.
+    """
+
+    def __init__(self, model, field):
+        self.field = field
+        names = [name.split(":")[0] for name in field.split(".")]
+        self.path = tuple(names[:-1])
+        self.name = names[-1]
+        self.boolean_yes = format_html(settings.BOOLEAN_YES)
+        self.boolean_no = format_html(settings.BOOLEAN_NO)
+
+        forward = True
+        for name in self.path:
+            model_field = get_model_field(model, name)
+            forward = forward and bool(
+                model_field and model_field.concrete and (model_field.many_to_one or model_field.one_to_one)
+            )
+            model = model_field.related_model if model_field else None
+
+        self.lookup = None
+        self.format = None
+        self.get_value = self.get_attr
+        model_field = get_model_field(model, self.name)
+        if model is None or not hasattr(model, self.name):
+            self.get_value = self.get_dynamic_attr
+        elif model_field is None:
+            pass
+        elif model_field.concrete and getattr(model_field, "choices", None):
+            display = inspect.getattr_static(model, f"get_{self.name}_display", None)
+            if isinstance(display, partialmethod):
+                self.attname = model_field.attname
+                self.choices = dict(make_hashable(model_field.flatchoices))
+                self.get_value = self.get_choice
+                self.format = self.format_choice
+        elif model_field.many_to_many or (model_field.one_to_many and model_field.auto_created):
+            self.get_value = self.get_related_list
+        elif model_field.concrete and not model_field.is_relation:
+            self.get_value = self.get_field_value
+            self.format = self.format_field_value
+
+        if self.format is not None and forward:
+            self.lookup = "__".join((*self.path, model_field.attname))
+
+    def __call__(self, instance):
+        for name in self.path:
+            instance = getattr(instance, name)
+        return self.get_value(instance)
+
+    def get_raw_value(self, instance):
+        """Valor sin formatear de una columna que también se lee con values()"""
+        for name in self.path:
+            instance = getattr(instance, name)
+            if instance is None:
+                return None
+        return getattr(instance, self.lookup.split("__")[-1])
+
+    def format_boolean(self, value):
+        return self.boolean_yes if value else self.boolean_no
+
+    def format_field_value(self, value):
+        if isinstance(value, bool):
+            return self.format_boolean(value)
+        return value
+
+    def format_choice(self, value):
+        return force_str(self.choices.get(make_hashable(value), value), strings_only=True)
+
+    def get_field_value(self, instance):
+        return self.format_field_value(getattr(instance, self.name))
+
+    def get_choice(self, instance):
+        return self.format_choice(getattr(instance, self.attname))
+
+    def get_related_list(self, instance):
+        return [str(obj) for obj in getattr(instance, self.name).all()]
+
+    def get_attr(self, instance):
+        attr = getattr(instance, self.name)
+        if attr.__class__.__name__ in ("ManyRelatedManager", "RelatedManager"):
+            attr = [str(obj) for obj in attr.all()]
+        attr = attr() if callable(attr) else attr
+        if isinstance(attr, bool):
+            return self.format_boolean(attr)
+        return attr
+
+    def get_dynamic_attr(self, instance):
+        return get_attr_of_object(instance, self.name)
+
+
+def compile_accessors(model, fields):
+    return tuple(FieldAccessor(model, field) for field in fields)
+
+
+def get_relation(model, name):
+    """Retorna la relación del modelo accesible con el atributo `name`"""
+    model_field = get_model_field(model, name)
+    if model_field is not None:
+        return model_field if model_field.is_relation else None
+    if not hasattr(model, "_meta"):
+        return None
+    for related in model._meta.related_objects:
+        if related.get_accessor_name() == name:
+            return related
+    return None
+
+
+def get_related_lookups(model, fields):
+    """
+    Calcula los lookups de select_related y prefetch_related que evitan una
+    consulta por fila al leer los campos con notación de punto.
+    """
+    select_related, prefetch_related = [], []
+    for field in fields:
+        names = [name.split(":")[0] for name in field.split(".")]
+        lookups = []
+        related_model = model
+        for name in names:
+            relation = get_relation(related_model, name)
+            if relation is None:
+                break
+            lookups.append(name)
+            related_model = relation.related_model
+            if relation.many_to_many or relation.one_to_many or related_model is None:
+                lookup = "__".join(lookups)
+                if lookup not in prefetch_related:
+                    prefetch_related.append(lookup)
+                lookups.pop()
+                break
+
+        lookup = "__".join(lookups)
+        if lookup and lookup not in select_related:
+            select_related.append(lookup)
+
+    return tuple(select_related), tuple(prefetch_related)
+
+
+def get_related_models(model, fields):
+    """
+    Modelos relacionados que se leen al mostrar los campos con notación de punto,
+    o un campo que es una relación (se muestra su str). Retorna (modelos, through
+    de las relaciones muchos a muchos).
+    """
+    models, throughs = [], []
+    for field in fields:
+        related_model = model
+        for name in [name.split(":")[0] for name in field.split(".")]:
+            relation = get_relation(related_model, name)
+            if relation is None or relation.related_model is None:
                 break
-    except ModuleNotFoundError as error:
+            if relation.many_to_many:
+                through = getattr(relation, "through", None) or relation.remote_field.through
+                if through not in throughs:
+                    throughs.append(through)
+            related_model = relation.related_model
+            if related_model is not model and related_model not in models:
+                models.append(related_model)
+
+    return tuple(models), tuple(throughs)
+
+
+# Indexes of classes by module, filled on first lookup
+_class_index = {}
+_missing_modules = set()
+
+
+def get_class_index(module_name):
+    """Retorna el índice nombre -> clase del módulo, construido una sola vez"""
+    index = _class_index.get(module_name)
+    if index is None:
+        module = import_module(module_name)
+        index = {
+            name: member for name, member in vars(module).items()
+            if inspect.isclass(member)
+        }
+        _class_index[module_name] = index
+    return index
+
+
+def clear_class_index():
+    """Limpia los índices de clases, p.ej. cuando el autoreload detecta cambios"""
+    _class_index.clear()
+    _missing_modules.clear()
+
+
+def import_class(module_name, class_name):
+    if module_name in _missing_modules:
+        return None
+    try:
+        index = get_class_index(module_name)
+    except ModuleNotFoundError:
+        _missing_modules.add(module_name)
         print("Not found %s" % module_name)
-    return cls
+        return None
+    return index.get(class_name)
 
 
 def import_mixins(*args):
@@ -101,7 +306,10 @@ def import_mixins(*args):
     return mixins
 
 def import_all_mixins():
-    names = "PermissionRequiredMixin", "BreadcrumbMixin", "UrlMixin", "TemplateMixin", "FilterMixin"
+    names = (
+        "PermissionRequiredMixin", "BreadcrumbMixin", "UrlMixin", "TemplateMixin", "FilterMixin",
+        "ConditionalMixin", "ObjectCacheMixin",
+    )
     mixins = import_mixins(*names)
     return mixins
 
@@ -113,7 +321,7 @@ def get_user_menu(menu_list, user):
             "name": menu.name,
             "url": menu.get_url(),
             "icon": menu.icon_class or "",
-            "submenus": get_user_menu(menu.submenus.all(), user),
+            "submenus": get_user_menu(menu.children, user),
             "is_root": not menu.parent,
             "is_group": menu.is_group
         }
@@ -1,7 +1,9 @@
-from .list import ListView
+from .list import ListView, AsyncListView
 from .create import CreateView
 from .update import UpdateView
-from .detail import DetailView
+from .detail import DetailView, AsyncDetailView
 from .delete import DeleteView
 from .duplicate import DuplicateView
+from .export import ExportView
+from .api import ApiListView, ApiDetailView
 from .base import ModuleView
\ No newline at end of file
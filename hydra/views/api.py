@@ -0,0 +1,212 @@
+""" Hydra JSON api views """
+# Django
+from django.utils.functional import cached_property
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.html import strip_tags
+from django.utils.safestring import SafeData
+from django.views.generic import View
+from django.views.generic.list import BaseListView
+from django.views.generic.detail import BaseDetailView
+
+# Hydra
+from .base import get_base_view
+from .list import ListMixin
+from hydra.utils import import_all_mixins, get_related_lookups
+from hydra import settings
+
+
+class ApiJSONEncoder(DjangoJSONEncoder):
+    """Serializa como texto lo que DjangoJSONEncoder no reconoce"""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+class InvalidFields(Exception):
+    """?fields= pide columnas que el api no expone"""
+
+
+def get_field_key(field):
+    """Nombre de la columna en el json, sin las etiquetas `campo:Etiqueta`"""
+    return ".".join(name.split(":")[0] for name in field.split("."))
+
+
+class ApiMixin:
+    """Proyección y serialización de columnas comunes al api de lista y detalle"""
+
+    fields_param = "fields"
+
+    def get_columns(self, accessors):
+        """Columnas pedidas en ?fields=, separadas por comas; por defecto todas"""
+        columns = {get_field_key(accessor.field): accessor for accessor in accessors}
+        value = self.request.GET.get(self.fields_param)
+        if not value:
+            return columns
+
+        keys = [key.strip() for key in value.split(",") if key.strip()]
+        unknown = [key for key in keys if key not in columns]
+        if unknown:
+            raise InvalidFields("Unknown fields: %s" % ", ".join(unknown))
+        return {key: columns[key] for key in keys}
+
+    def project(self, queryset, columns, extra=()):
+        """Lee solo las columnas pedidas con values(), o las instancias si alguna no lo permite"""
+        accessors = columns.values()
+        if all(accessor.lookup for accessor in accessors):
+            fields = dict.fromkeys(("pk", *extra, *(accessor.lookup for accessor in accessors)))
+            return queryset.values(*fields)
+
+        select_related, prefetch_related = get_related_lookups(
+            self.model, [accessor.field for accessor in accessors]
+        )
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def serialize(self, record, columns):
+        if isinstance(record, dict):
+            data = {"pk": record["pk"]}
+            for key, accessor in columns.items():
+                data[key] = record[accessor.lookup]
+            return data
+
+        data = {"pk": record.pk}
+        for key, accessor in columns.items():
+            if accessor.lookup:
+                value = accessor.get_raw_value(record)
+            else:
+                value = accessor(record)
+                if isinstance(value, SafeData):
+                    value = strip_tags(value)
+            data[key] = value
+        return data
+
+
+class ApiListMixin(ApiMixin, ListMixin):
+    """Lista en json con la búsqueda, permisos y paginación de la ListView"""
+
+    format_param = "format"
+
+    @cached_property
+    def columns(self):
+        return self.get_columns(self.site.list_accessors)
+
+    def prepare_queryset(self, queryset):
+        extra = ()
+        if self.site.pagination == "keyset":
+            extra = tuple(name.lstrip("-") for name in self.site.keyset_ordering)
+        return self.project(queryset, self.columns, extra)
+
+    def get_page_urls(self, page):
+        if self.site.pagination == "keyset":
+            urls = self.get_cursor_urls(page)
+            return {"next": urls["next_url"], "previous": urls["previous_url"]}
+
+        data = {"count": page.paginator.count, "next": None, "previous": None}
+        for key, has_page, get_number in (
+            ("next", page.has_next, page.next_page_number),
+            ("previous", page.has_previous, page.previous_page_number),
+        ):
+            if has_page():
+                params = self.request.GET.copy()
+                params[self.page_kwarg] = get_number()
+                data[key] = "?%s" % params.urlencode()
+        return data
+
+    def stream_lines(self, queryset):
+        """Todas las filas filtradas en JSON Lines, leídas por bloques"""
+        encoder = ApiJSONEncoder()
+        for record in queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            yield encoder.encode(self.serialize(record, self.columns)) + "\n"
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+
+        if request.GET.get(self.format_param) == "jsonl":
+            return StreamingHttpResponse(
+                self.stream_lines(queryset), content_type="application/x-ndjson"
+            )
+
+        page_size = self.get_paginate_by(queryset)
+        if page_size:
+            paginator, page, object_list, is_paginated = self.paginate_queryset(queryset, page_size)
+            data = self.get_page_urls(page)
+        else:
+            object_list = list(queryset)
+            data = {"count": len(object_list), "next": None, "previous": None}
+
+        data["results"] = [self.serialize(record, self.columns) for record in object_list]
+        return JsonResponse(data, encoder=ApiJSONEncoder)
+
+
+class ApiDetailMixin(ApiMixin):
+    """Detalle en json del objeto, con los permisos de la DetailView"""
+
+    action = "detail"
+
+    def get(self, request, *args, **kwargs):
+        columns = self.get_columns(self.site.detail_accessors)
+        lookup_field = self.site.plan.lookup_field
+        queryset = self.get_queryset().filter(**{lookup_field: kwargs[lookup_field]})
+
+        record = next(iter(self.project(queryset, columns)[:1]), None)
+        if record is None:
+            raise Http404("No %s found matching the query" % self.model._meta.verbose_name)
+        return JsonResponse(self.serialize(record, columns), encoder=ApiJSONEncoder)
+
+
+class ApiListView(View):
+    site = None
+
+    def get_view_class(self):
+        """ Crear la vista del api de lista del modelo """
+        # Class
+        mixins = [*self.site.list_mixins, *import_all_mixins(), ApiListMixin]
+        View = get_base_view(BaseListView, mixins, self.site)
+
+        # Set attriburtes
+        View.queryset = self.site.queryset
+        View.paginate_by = self.site.paginate_by
+
+        return View
+
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("api_list", self.get_view_class)
+        try:
+            return view(request, *args, **kwargs)
+        except InvalidFields as error:
+            return JsonResponse({"error": str(error)}, status=400)
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
+class ApiDetailView(View):
+    site = None
+
+    def get_view_class(self):
+        """ Crear la vista del api de detalle del modelo """
+        # Class
+        mixins = [*self.site.detail_mixins, *import_all_mixins(), ApiDetailMixin]
+        View = get_base_view(BaseDetailView, mixins, self.site)
+
+        # Set attriburtes
+        View.queryset = self.site.queryset
+
+        return View
+
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("api_detail", self.get_view_class)
+        try:
+            return view(request, *args, **kwargs)
+        except InvalidFields as error:
+            return JsonResponse({"error": str(error)}, status=400)
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
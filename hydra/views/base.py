@@ -6,6 +6,7 @@ from django.contrib import messages
 # Utils
 from hydra.shortcuts import get_urls_of_site
 from hydra.utils import get_user_menu
+from hydra.menus import get_menu_tree
 
 
 
@@ -24,8 +25,9 @@ class ModuleView(TemplateView):
                 "site": opts
             })
             
+        menu = get_menu_tree().get(self.menu.pk)
         data = {
-            "object_list": get_user_menu(self.menu.submenus.all(), self.request.user)
+            "object_list": get_user_menu(menu.children if menu else [], self.request.user)
         }
 
         context.update(data)
@@ -40,7 +42,7 @@ class ModuleView(TemplateView):
 
 
 def get_base_view(ClassView, mixins, site):
-    class View(ClassView):
+    class View(*mixins, ClassView):
         def get_context_data(self, **kwargs):
             context = super().get_context_data(**kwargs)
             opts = {
@@ -62,7 +64,6 @@ def get_base_view(ClassView, mixins, site):
         def get_success_url(self):
             return get_urls_of_site(self.site, self.object).get(f"{self.site.success_url}")
 
-    View.__bases__ = (*mixins, *View.__bases__)
     View.site = site
     View.model = site.model
     return View
@@ -59,18 +59,20 @@ class CreateMixin:
 class CreateView(View):
     site = None
 
-    def view(self, request, *args, **kwargs):
-        """ Crear la List View del modelo """
+    def get_view_class(self):
+        """ Crear la Create View del modelo """
         # Class
-        mixins = import_all_mixins() + [CreateMixin]
+        mixins = [*self.site.form_mixins, *import_all_mixins(), CreateMixin]
         View = get_base_view(BaseCreateView, mixins, self.site)
 
         # Set attributes
         View.form_class = self.site.form_class
         View.fields = self.site.fields
 
-        View.__bases__ = (*self.site.form_mixins, *View.__bases__)
-        view = View.as_view()
+        return View
+
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("create", self.get_view_class)
         return view(request, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
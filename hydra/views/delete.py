@@ -35,15 +35,16 @@ class DeleteMixin:
 class DeleteView(View):
     site = None
 
-    def view(self, request, *args, **kwargs):
-        """ Crear la List View del modelo """
+    def get_view_class(self):
+        """ Crear la Delete View del modelo """
         # Class
-        mixins = import_all_mixins() + [DeleteMixin]
+        mixins = [*import_all_mixins(), DeleteMixin]
         View = get_base_view(BaseDeleteView, mixins, self.site)
-        
-        # Set attribures
 
-        view = View.as_view()
+        return View
+
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("delete", self.get_view_class)
         return view(request, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
@@ -1,21 +1,23 @@
 """ """
+# Python
+from asgiref.sync import sync_to_async
+
 # Django
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import View
 from django.views.generic import DetailView as BaseDetailView
-from django.contrib.admin.utils import flatten
+from django.views.generic.detail import SingleObjectMixin
 
 # Mixins
 #from hydra.mixins import MultiplePermissionRequiredModelMixin
 
 # Hydra
 from .base import get_base_view
+from hydra.fragments import get_fragments
 from hydra.shortcuts import get_urls_of_site
 
-from hydra.utils import (
-    get_label_of_field,
-    get_attr_of_object,
-    import_all_mixins
-)
+from hydra.utils import import_all_mixins
 
 class DetailMixin:
     """Definimos la clase que utilizará el modelo"""
@@ -24,12 +26,21 @@ class DetailMixin:
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        flatten_results, fieldset_results = self.get_results()
-        opts = {
-            "results": fieldset_results,
-            "flatten_results": flatten_results,
-            "urls": get_urls_of_site(self.site, self.object),
-        }
+        if self.site.fragment_cache:
+            # Sin calcular mientras el {% fragment %} del detalle esté en la caché
+            results = SimpleLazyObject(self.get_results)
+            opts = {
+                "results": SimpleLazyObject(lambda: results[1]),
+                "flatten_results": SimpleLazyObject(lambda: results[0]),
+                "fragment": get_fragments(self.site, "detail", [self.object], self.request.user)[0],
+            }
+        else:
+            flatten_results, fieldset_results = self.get_results()
+            opts = {
+                "results": fieldset_results,
+                "flatten_results": flatten_results,
+            }
+        opts["urls"] = get_urls_of_site(self.site, self.object)
 
         if "site" in context:
             context["site"].update(opts)
@@ -41,45 +52,88 @@ class DetailMixin:
         return context
 
     def get_results(self):
-        fields = flatten(self.site.detail_fields) 
-        fields = fields if fields else (field.name for field in self.model._meta.fields)
         results = {}
-        for field in fields:
-            label = get_label_of_field(self.object, field)
-            value = get_attr_of_object(self.object, field)
-            results[field] = (label, value)
+        labels = self.site.plan.labels
+        for accessor in self.site.detail_accessors:
+            value = accessor(self.object)
+            results[accessor.field] = (labels[accessor.field], value)
 
         flatten_results = results.values()
         fieldset_results = []
-        for fieldset in self.site.detail_fields:
-            if isinstance(fieldset, (list, tuple)):
-                fieldset_results.append({
-                    'bs_cols': int(12 / len(fieldset)),
-                    'fields':[results.get(field, ()) for field in fieldset]
-                })
-            else:
-                fieldset_results.append({
-                    'bs_cols': 12,
-                    'fields': [results.get(fieldset, ()),]
-                })
+        for bs_cols, fieldset in self.site.plan.detail_fieldsets:
+            fieldset_results.append({
+                'bs_cols': bs_cols,
+                'fields': [results.get(field, ()) for field in fieldset]
+            })
 
         return flatten_results, fieldset_results
 
 
+class AsyncDetailMixin(DetailMixin):
+    """
+    DetailMixin para ASGI: el objeto se lee con aget() del ORM asíncrono. Si un
+    mixin del site redefine get_object, o el site usa object_cache, se llama a
+    get_object en un hilo.
+    """
+
+    def has_custom_get_object(self):
+        from hydra.mixins import ObjectCacheMixin
+
+        return any(
+            "get_object" in vars(cls) for cls in type(self).__mro__
+            if cls not in (ObjectCacheMixin, SingleObjectMixin)
+        )
+
+    async def aget_object(self):
+        if self.site.object_cache or self.has_custom_get_object():
+            return await sync_to_async(self.get_object)()
+
+        lookup_field = self.site.plan.lookup_field
+        try:
+            return await self.get_queryset().aget(**{lookup_field: self.kwargs[lookup_field]})
+        except self.model.DoesNotExist:
+            raise Http404("No %s found matching the query" % self.model._meta.verbose_name)
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        # Las columnas relacionadas, menús y breadcrumbs pueden consultar la base de datos
+        context = await sync_to_async(self.get_context_data)(object=self.object)
+        return self.render_to_response(context)
+
+
 class DetailView(View):
     site = None
 
-    def view(self, request, *args, **kwargs):
-        """ Crear la List View del modelo """
+    def get_view_class(self):
+        """ Crear la Detail View del modelo """
         # Class
-        mixins = import_all_mixins() + [DetailMixin]
+        mixins = [*self.site.detail_mixins, *import_all_mixins(), DetailMixin]
         View = get_base_view(BaseDetailView, mixins, self.site)
 
-        # Set attributes
-        View.__bases__ = (*self.site.detail_mixins, *View.__bases__)
+        return View
 
-        view = View.as_view()
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("detail", self.get_view_class)
         return view(request, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
         return self.view(request, *args, **kwargs)
+
+
+class AsyncDetailView(View):
+    site = None
+
+    def get_view_class(self):
+        """ Crear la Detail View asíncrona del modelo """
+        # Class
+        mixins = [*self.site.detail_mixins, *import_all_mixins(), AsyncDetailMixin]
+        View = get_base_view(BaseDetailView, mixins, self.site)
+
+        return View
+
+    async def view(self, request, *args, **kwargs):
+        view = self.site.get_view("async_detail", self.get_view_class)
+        return await view(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.view(request, *args, **kwargs)
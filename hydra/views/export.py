@@ -0,0 +1,90 @@
+""" Hydra export view """
+# Django
+from django.views.generic import View
+from django.views.generic.list import BaseListView
+from django.http import Http404, StreamingHttpResponse
+
+# Hydra
+from .base import get_base_view
+from hydra.export import get_export_value, stream_csv, stream_xlsx, XLSX_CONTENT_TYPE
+from hydra.utils import import_all_mixins
+from hydra import settings
+
+
+class ExportMixin:
+    """Exporta las filas de la lista, con la misma búsqueda y permisos, en csv o xlsx"""
+
+    action = "export"
+    format_param = "format"
+    formats = {
+        "csv": "text/csv; charset=utf-8",
+        "xlsx": XLSX_CONTENT_TYPE,
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.site.pagination == "keyset":
+            # El mismo orden con el que la lista pagina
+            queryset = queryset.order_by(*self.site.keyset_ordering)
+        return queryset
+
+    def get_headers(self):
+        labels = self.site.plan.labels
+        return [str(labels[name]) for name in self.site.plan.list_fields]
+
+    def get_rows(self, queryset):
+        """Filas leídas por bloques con iterator(), para que la memoria no crezca con el total"""
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        accessors = self.site.list_accessors
+
+        if self.site.plan.list_instance_lookups is None:
+            queryset = queryset.values(*self.site.plan.list_values)
+            for row in queryset.iterator(chunk_size=chunk_size):
+                yield [get_export_value(accessor.format(row[accessor.lookup])) for accessor in accessors]
+            return
+
+        select_related, prefetch_related = self.site.list_related_lookups
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            yield [get_export_value(accessor(instance)) for accessor in accessors]
+
+    def get_filename(self, extension):
+        return "%s.%s" % ("_".join(self.site.plan.info), extension)
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get(self.format_param, "csv")
+        if export_format not in self.formats:
+            raise Http404("Unknown export format: %s" % export_format)
+
+        stream = stream_csv if export_format == "csv" else stream_xlsx
+        rows = self.get_rows(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream(self.get_headers(), rows), content_type=self.formats[export_format]
+        )
+        response["Content-Disposition"] = 'attachment; filename="%s"' % self.get_filename(export_format)
+        return response
+
+
+class ExportView(View):
+    site = None
+
+    def get_view_class(self):
+        """ Crear la Export View del modelo """
+        # Class
+        mixins = [*self.site.list_mixins, *import_all_mixins(), ExportMixin]
+        View = get_base_view(BaseListView, mixins, self.site)
+
+        # Set attriburtes
+        View.queryset = self.site.queryset
+
+        return View
+
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("export", self.get_view_class)
+        return view(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
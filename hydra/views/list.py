@@ -1,21 +1,39 @@
 """ Hydra list view """
+# Python
+import itertools
+from functools import partial
+from asgiref.sync import sync_to_async
+
 # Django
 from django.views.generic import View
 from django.views.generic import ListView as BaseListView
+from django.http import Http404
+from django.utils.translation import gettext as _
 
 # Mixins
 #from hydra.mixins import MultiplePermissionRequiredModelMixin
 
 # Hydra
 from .base import get_base_view
+from hydra.fragments import get_fragments
 from hydra.shortcuts import get_urls_of_site
+from hydra.paginator import KeysetPaginator, InvalidCursor
 from hydra.utils import import_all_mixins
 
-# Utilities
-from hydra.utils import (
-    get_label_of_field,
-    get_attr_of_object,
-)
+
+class LazyRow(dict):
+    """
+    Fila con fragment_cache: los valores y las urls se calculan al leerlos, así
+    las filas cuyo {% fragment %} está en la caché no los calculan.
+    """
+
+    def __init__(self, lazy, **items):
+        super().__init__(**items)
+        self.lazy = lazy
+
+    def __missing__(self, key):
+        value = self[key] = self.lazy.pop(key)()
+        return value
 
 
 class ListMixin:
@@ -29,11 +47,17 @@ class ListMixin:
         opts = {
             "headers": self.get_headers(),
             "rows": self.get_rows(context["object_list"]),
-            "page_start_index":context["page_obj"].start_index() if context["is_paginated"] else 1,
-            "page_end_index":context["page_obj"].end_index() if context["is_paginated"] else context["object_list"].count(),
-            "total_records": context["paginator"].count if context["is_paginated"] else context["object_list"].count(),
         }
 
+        if self.site.pagination == "keyset":
+            opts.update(self.get_cursor_urls(context["page_obj"]))
+        else:
+            opts.update({
+                "page_start_index":context["page_obj"].start_index() if context["is_paginated"] else 1,
+                "page_end_index":context["page_obj"].end_index() if context["is_paginated"] else context["object_list"].count(),
+                "total_records": context["paginator"].count if context["is_paginated"] else context["object_list"].count(),
+            })
+
         if "site" in context:
             context["site"].update(opts)
         else:
@@ -43,12 +67,71 @@ class ListMixin:
     
         return context
 
+    def paginate_queryset(self, queryset, page_size):
+        if self.site.pagination != "keyset":
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, self.site.keyset_ordering)
+        try:
+            page = paginator.get_page(self.request.GET.get(paginator.cursor_param))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_cursor_urls(self, page):
+        urls = {"next_url": None, "previous_url": None}
+        for key, cursor in (("next_url", page.next_cursor), ("previous_url", page.previous_cursor)):
+            if cursor is None:
+                continue
+            params = self.request.GET.copy()
+            params.pop("page", None)
+            params[page.paginator.cursor_param] = cursor
+            urls[key] = "?%s" % params.urlencode()
+        return urls
+
+    def get_queryset(self):
+        return self.prepare_queryset(super().get_queryset())
+
+    def prepare_queryset(self, queryset):
+        """Selecciona lo que leen las filas: values() o los select/prefetch_related"""
+        if self.site.list_mode == "values":
+            return queryset.values(*self.site.plan.list_values)
+
+        select_related, prefetch_related = self.site.list_related_lookups
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
     def get_headers(self):
-        for name in self.site.list_fields:
-            yield get_label_of_field(self.model, name)
+        labels = self.site.plan.labels
+        for name in self.site.plan.list_fields:
+            yield labels[name]
+
+    def get_fragments(self, objects):
+        if not self.site.fragment_cache:
+            return itertools.repeat(None)
+        return get_fragments(self.site, "list", objects, self.request.user)
 
     def get_rows(self, queryset):
-        for instance in queryset:
+        if self.site.list_mode == "values":
+            yield from self.get_value_rows(queryset)
+            return
+
+        instances = list(queryset)
+        for instance, fragment in zip(instances, self.get_fragments(instances)):
+            if fragment is not None:
+                yield LazyRow(
+                    {
+                        "values": partial(self.get_values, instance),
+                        "urls": partial(get_urls_of_site, self.site, instance),
+                    },
+                    instance=instance,
+                    fragment=fragment,
+                )
+                continue
+
             urls = get_urls_of_site(self.site, instance)
             row = {
                 "instance": instance,
@@ -59,27 +142,159 @@ class ListMixin:
             yield row
 
     def get_values(self, instance):
-        for name in self.site.list_fields:
-            value = get_attr_of_object(instance, name)
-            yield value
+        for accessor in self.site.list_accessors:
+            yield accessor(instance)
+
+    def get_row_instances(self, rows):
+        """Instancias de las filas, solo si alguna columna no se puede leer con values()"""
+        lookups = self.site.plan.list_instance_lookups
+        if lookups is None:
+            return {}
+        select_related, prefetch_related = lookups
+        queryset = self.queryset if self.queryset is not None else self.model._default_manager.all()
+        queryset = queryset.filter(pk__in=[row["pk"] for row in rows])
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return {instance.pk: instance for instance in queryset}
+
+    def get_value_rows(self, queryset):
+        """Filas armadas desde los diccionarios de values(), sin crear instancias"""
+        rows = list(queryset)
+        instances = self.get_row_instances(rows)
+        needs_instances = self.site.plan.list_instance_lookups is not None
+        lookup_field = self.site.plan.lookup_field
+        url_templates = self.site.get_url_templates()
+
+        if needs_instances:
+            # Filas borradas entre las dos consultas
+            rows = [row for row in rows if row["pk"] in instances]
+
+        for row, fragment in zip(rows, self.get_fragments(rows)):
+            instance = instances.get(row["pk"])
+            if fragment is not None:
+                yield LazyRow(
+                    {
+                        "values": partial(self.get_row_values, row, instance),
+                        "urls": partial(url_templates.get_urls, row[lookup_field]),
+                    },
+                    instance=row if instance is None else instance,
+                    fragment=fragment,
+                )
+                continue
+
+            yield {
+                "instance": row if instance is None else instance,
+                "values": self.get_row_values(row, instance),
+                "urls": url_templates.get_urls(row[lookup_field]),
+            }
+
+    def get_row_values(self, row, instance):
+        return [
+            accessor.format(row[accessor.lookup]) if accessor.lookup else accessor(instance)
+            for accessor in self.site.list_accessors
+        ]
+
+class AsyncListMixin(ListMixin):
+    """
+    ListMixin para ASGI: el conteo y las filas de la página se leen con el ORM
+    asíncrono antes de armar el contexto, que ya no consulta la base de datos.
+    """
+
+    page_result = None
+    count = None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        if self.count is not None:
+            paginator.count = self.count # Leído antes con acount()
+        return paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_result is not None:
+            return self.page_result
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_empty_message(self):
+        return _("Empty list and “%(class_name)s.allow_empty” is False.") % {
+            "class_name": self.__class__.__name__,
+        }
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if self.site.pagination == "keyset":
+            paginator = KeysetPaginator(queryset, page_size, self.site.keyset_ordering)
+            try:
+                page = await paginator.aget_page(self.request.GET.get(paginator.cursor_param))
+            except InvalidCursor as error:
+                raise Http404(str(error))
+            return (paginator, page, page.object_list, page.has_other_pages())
+
+        self.count = await queryset.acount()
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        page.object_list = [object async for object in page.object_list]
+        return (paginator, page, page.object_list, is_paginated)
+
+    async def get(self, request, *args, **kwargs):
+        # Los motores de búsqueda y los get_queryset de los mixins pueden consultar la base de datos
+        self.object_list = await sync_to_async(self.get_queryset)()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            if not self.get_allow_empty() and not await self.object_list.aexists():
+                raise Http404(self.get_empty_message())
+            self.page_result = await self.apaginate_queryset(self.object_list, page_size)
+        else:
+            # Llena la caché del queryset, así count() y la plantilla no consultan
+            [object async for object in self.object_list]
+            if not self.get_allow_empty() and not self.object_list:
+                raise Http404(self.get_empty_message())
+
+        # Menús y breadcrumbs pueden consultar la base de datos
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
 
 class ListView(View):
     site = None
 
-    def view(self, request, *args, **kwargs):
+    def get_view_class(self):
         """ Crear la List View del modelo """
         # Class
-        mixins = import_all_mixins() + [ListMixin]
+        mixins = [*self.site.list_mixins, *import_all_mixins(), ListMixin]
         View = get_base_view(BaseListView, mixins, self.site)
         
         # Set attriburtes
         View.queryset = self.site.queryset
         View.paginate_by = self.site.paginate_by
 
-        View.__bases__ = (*self.site.list_mixins, *View.__bases__)
+        return View
 
-        view = View.as_view()
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("list", self.get_view_class)
         return view(request, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
         return self.view(request, *args, **kwargs)
+
+
+class AsyncListView(View):
+    site = None
+
+    def get_view_class(self):
+        """ Crear la List View asíncrona del modelo """
+        # Class
+        mixins = [*self.site.list_mixins, *import_all_mixins(), AsyncListMixin]
+        View = get_base_view(BaseListView, mixins, self.site)
+
+        # Set attriburtes
+        View.queryset = self.site.queryset
+        View.paginate_by = self.site.paginate_by
+
+        return View
+
+    async def view(self, request, *args, **kwargs):
+        view = self.site.get_view("async_list", self.get_view_class)
+        return await view(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.view(request, *args, **kwargs)
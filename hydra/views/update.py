@@ -20,19 +20,20 @@ class UpdateMixin:
 class UpdateView(View):
     site = None
 
-    def view(self, request, *args, **kwargs):
-        """ Crear la List View del modelo """
+    def get_view_class(self):
+        """ Crear la Update View del modelo """
         # Class
-        mixins = import_all_mixins() + [UpdateMixin]
+        mixins = [*self.site.form_mixins, *import_all_mixins(), UpdateMixin]
         View = get_base_view(BaseUpdateView, mixins, self.site)
 
         # Set attribures
         View.form_class = self.site.form_class
         View.fields = self.site.fields
 
-        View.__bases__ = (*self.site.form_mixins, *View.__bases__)
+        return View
 
-        view = View.as_view()
+    def view(self, request, *args, **kwargs):
+        view = self.site.get_view("update", self.get_view_class)
         return view(request, *args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+""" Runs hydra's test suite: python runtests.py [test labels] """
+import os
+import sys
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+if __name__ == "__main__":
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.settings"
+    django.setup()
+    TestRunner = get_runner(settings)
+    test_runner = TestRunner()
+    failures = test_runner.run_tests(sys.argv[1:] or ["tests"])
+    sys.exit(bool(failures))
@@ -0,0 +1,58 @@
+from django.http import Http404
+
+from hydra import site, ModelSite
+from hydra.search import FullTextSearchBackend
+
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from .models import Customer, Order, Product
+
+
+class HiddenCustomerMixin:
+    """Oculta en el detalle los clientes cuyo nombre empieza con un punto"""
+
+    def get_object(self, queryset=None):
+        customer = super().get_object(queryset)
+        if customer.name.startswith("."):
+            raise Http404("Hidden customer")
+        return customer
+
+
+class CustomerSite(ModelSite):
+    list_fields = ("name", "city.name")
+    detail_fields = ("name", "city")
+    detail_mixins = (HiddenCustomerMixin,)
+    use_async = True
+    search_fields = ("name__icontains",)
+    search_backend_class = FullTextSearchBackend
+    paginate_by = 10
+    pagination = "keyset"
+    order_by = ("-name",)
+
+
+class ProductSite(ModelSite):
+    list_fields = ("name", "active", "customer")
+    detail_fields = ("name", "active", "customer")
+    prepopulate_slug = ("name",)
+    unique_slug = True
+    search_fields = ("name__icontains",)
+    paginate_by = 10
+    order_by = ("name",)
+    updated_field = "updated"
+
+
+class OrderSite(ModelSite):
+    queryset = Order.objects.filter(archived=False).order_by("number").annotate(
+        label=Concat("number", Value(" - "), "customer__name")
+    )
+    list_fields = ("number", "label:Orden", "customer")
+    detail_fields = ("number", "customer")
+    list_mode = "values"
+    paginate_by = 10
+    fragment_cache = True
+
+
+site.register(Customer, CustomerSite)
+site.register(Product, ProductSite)
+site.register(Order, OrderSite)
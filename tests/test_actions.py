@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from hydra.management.commands.createactions import clear_elements_catalog
+from hydra.models import Action, Menu
+
+from .utils import ROOT
+
+
+class ViewsCatalogTests(SimpleTestCase):
+    def test_catalog_is_not_built_on_import(self):
+        code = (
+            "import django; django.setup(); import hydra.forms; "
+            "from hydra.management.commands.createactions import get_views_catalog; "
+            "print(get_views_catalog.cache_info().currsize)"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="tests.settings")
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+            capture_output=True, text=True,
+        ).stdout
+        self.assertEqual(output.strip(), "0")
+
+
+class CreateActionsTests(TestCase):
+    def setUp(self):
+        clear_elements_catalog()
+        self.addCleanup(clear_elements_catalog)
+
+    def create_stale_actions(self):
+        stale_model = Action.objects.create(
+            to=Action.ToChoices.MODEL, app_label="shop", name="Gone", element="gone"
+        )
+        stale_view = Action.objects.create(
+            to=Action.ToChoices.CLASSVIEW, app_label="shop", name="Report", element="ReportView"
+        )
+        Menu.objects.create(name="Gone", action=stale_model, sequence=1)
+        return stale_model, stale_view
+
+    def call_command(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("createactions", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_creates_model_actions(self):
+        self.call_command()
+        self.assertTrue(Action.objects.filter(app_label="shop", element="product").exists())
+
+    def test_stale_actions_are_kept_without_prune(self):
+        stale_model, stale_view = self.create_stale_actions()
+        stdout, _ = self.call_command()
+        self.assertIn("pass --prune", stdout)
+        self.assertEqual(Action.objects.filter(pk__in=[stale_model.pk, stale_view.pk]).count(), 2)
+        self.assertTrue(Menu.objects.filter(action=stale_model).exists())
+
+    def test_prune_deletes_stale_actions(self):
+        stale_model, stale_view = self.create_stale_actions()
+        self.call_command("--prune")
+        self.assertFalse(Action.objects.filter(pk__in=[stale_model.pk, stale_view.pk]).exists())
+        self.assertFalse(Menu.objects.filter(name="Gone").exists())
+
+    def test_prune_keeps_view_actions_of_broken_views(self):
+        stale_model, stale_view = self.create_stale_actions()
+
+        def broken_import(name, *args):
+            if name == "tests.shop.views":
+                raise ImportError("cannot import name 'Missing'")
+            return import_module(name, *args)
+
+        with mock.patch(
+            "hydra.management.commands.createactions.import_module", side_effect=broken_import
+        ):
+            _, stderr = self.call_command("--prune")
+
+        self.assertIn("The views of shop could not be imported", stderr)
+        self.assertTrue(Action.objects.filter(pk=stale_view.pk).exists())
+        self.assertFalse(Action.objects.filter(pk=stale_model.pk).exists())
+
+
+class CreateBaseMenuTests(TestCase):
+    def setUp(self):
+        clear_elements_catalog()
+        self.addCleanup(clear_elements_catalog)
+        self.call_command()
+        self.module_view = Action.objects.get(app_label="hydra", element="ModuleView")
+        self.product = Action.objects.get(app_label="shop", element="product")
+
+        # Groups left by a previous base menu, and menus created in the admin
+        stale_group = Menu.objects.create(name="Viejo", action=self.module_view, sequence=9)
+        Menu.objects.create(name="Productos", parent=stale_group, action=self.product, sequence=1)
+        other_group = Menu.objects.create(name="Otro", action=self.module_view, sequence=10)
+        Menu.objects.create(name="Productos", parent=other_group, action=self.product, sequence=1)
+        Menu.objects.create(name="Notas", parent=other_group, action=self.module_view, sequence=2)
+        Menu.objects.create(name="Reportes", action=self.product, sequence=11)
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command("createbasemenu", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_only_stale_base_menus_are_deleted(self):
+        stdout = self.call_command()
+        self.assertIn("pass --prune", stdout)
+        self.assertFalse(Menu.objects.filter(route__startswith="viejo").exists())
+        # "Otro" keeps the admin submenu "Notas", so it is not deleted in cascade
+        self.assertEqual(
+            set(Menu.objects.filter(route__regex=r"^(otro|reportes)").values_list("route", flat=True)),
+            {"otro", "otro/notas", "reportes"},
+        )
+
+    def test_prune_deletes_every_menu_outside_the_base_menu(self):
+        self.call_command("--prune")
+        self.assertFalse(Menu.objects.filter(route__in=["viejo", "otro", "reportes"]).exists())
+        self.assertTrue(Menu.objects.filter(route="shop").exists())
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from hydra import site
+from hydra.shortcuts import get_urls_of_site
+
+from .shop.models import Product
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.product = Product.objects.create(name="Mesa")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.urls = get_urls_of_site(site.get_modelsite(Product), self.product)
+
+    def test_list_projects_fields(self):
+        response = self.client.get(self.urls["api_list"], {"fields": "name"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [{"pk": self.product.pk, "name": "Mesa"}])
+
+    def test_unknown_fields_are_a_json_bad_request(self):
+        for url in (self.urls["api_list"], self.urls["api_detail"]):
+            response = self.client.get(url, {"fields": "name,secret"})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertEqual(response.json(), {"error": "Unknown fields: secret"})
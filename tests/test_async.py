@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from hydra import site
+from hydra.shortcuts import get_urls_of_site
+
+from .shop.models import City, Customer
+from .shop.sites import CustomerSite
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        city = City.objects.create(name="Cuenca")
+        cls.customer = Customer.objects.create(name="Ana", city=city)
+        cls.hidden = Customer.objects.create(name=".Oculto", city=city)
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+        self.model_site = site.get_modelsite(Customer)
+        self.model_site.search_backend._fts_ready.clear()
+
+    def get_urls(self, customer=None):
+        return get_urls_of_site(self.model_site, customer)
+
+    async def test_list(self):
+        response = await self.async_client.get(self.get_urls()["list"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().strip(), "Ana|Cuenca;.Oculto|Cuenca;")
+
+    async def test_detail_goes_through_get_object_overrides(self):
+        response = await self.async_client.get(self.get_urls(self.customer)["detail"])
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(self.get_urls(self.hidden)["detail"])
+        self.assertEqual(response.status_code, 404)
+
+    async def test_full_text_search(self):
+        await self.async_call_command("rebuildsearchindex", "shop.Customer", stdout=StringIO())
+        # A worker that did not build the index checks that the table exists
+        self.model_site.search_backend._fts_ready.clear()
+        response = await self.async_client.get(self.get_urls()["list"], {"search": "ana"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().strip(), "Ana|Cuenca;")
+
+    async def test_allow_empty(self):
+        await Customer.objects.all().adelete()
+        url = self.get_urls()["list"]
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        view_class = self.model_site.get_view("async_list", None).view_class
+        view_class.allow_empty = False
+        try:
+            for paginate_by in (10, None):
+                view_class.paginate_by = paginate_by
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 404)
+        finally:
+            del view_class.allow_empty
+            view_class.paginate_by = CustomerSite.paginate_by
+
+    async def async_call_command(self, *args, **kwargs):
+        from asgiref.sync import sync_to_async
+        await sync_to_async(call_command)(*args, **kwargs)
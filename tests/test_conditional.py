@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .shop.models import City, Customer, Product
+
+
+class ConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.customer = Customer.objects.create(name="Ana", city=City.objects.create(name="Cuenca"))
+        Product.objects.create(name="Mesa", customer=cls.customer)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get("/shop/product/")["ETag"]
+        response = self.client.get("/shop/product/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_changes_modify_the_list(self):
+        etag = self.client.get("/shop/product/")["ETag"]
+        self.customer.name = "Eva"
+        self.customer.save()
+        response = self.client.get("/shop/product/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Eva", response.content.decode())
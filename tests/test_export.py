@@ -0,0 +1,124 @@
+import datetime
+import io
+import re
+import zipfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils.safestring import mark_safe
+
+from hydra.export import ZipStream, get_export_value, stream_csv, stream_xlsx
+
+from .shop.models import City, Customer
+
+
+def read_zip(chunks):
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    return archive
+
+
+class ZipStreamTests(SimpleTestCase):
+    def write(self, stream, files):
+        for name, data in files.items():
+            yield from stream.write_file(name, [data[:100], data[100:]])
+        yield from stream.close()
+
+    def test_classic_zip(self):
+        files = {"a.txt": b"a" * 300, "b.txt": b"b" * 300}
+        data = b"".join(self.write(ZipStream(), files))
+        self.assertNotIn(b"PK\x06\x06", data)
+        archive = read_zip([data])
+        self.assertEqual({name: archive.read(name) for name in archive.namelist()}, files)
+
+    def test_zip64_offsets_and_counts(self):
+        # Lower limits exercise the records written past 4 GiB or 65535 entries
+        stream = ZipStream()
+        stream.zip64_limit = 200
+        stream.zip64_count_limit = 2
+        files = {"file%s.bin" % index: bytes(range(256)) * 2 for index in range(5)}
+        data = b"".join(self.write(stream, files))
+        self.assertIn(b"PK\x06\x06", data)
+        self.assertIn(b"PK\x06\x07", data)
+        archive = read_zip([data])
+        self.assertEqual({name: archive.read(name) for name in archive.namelist()}, files)
+        self.assertGreater(archive.getinfo("file4.bin").header_offset, 200)
+
+
+class XlsxTests(SimpleTestCase):
+    def get_sheets(self, archive):
+        names = sorted(name for name in archive.namelist() if name.startswith("xl/worksheets/"))
+        return [archive.read(name).decode() for name in names]
+
+    def test_rows_continue_in_new_sheets(self):
+        rows = [[index, "row %s" % index] for index in range(10)]
+        archive = read_zip(stream_xlsx(["id", "name"], rows, max_rows=4))
+        sheets = self.get_sheets(archive)
+        self.assertEqual(len(sheets), 4)
+        self.assertEqual([sheet.count("<row>") for sheet in sheets], [4, 4, 4, 2])
+        self.assertIn('r:id="rId4"', archive.read("xl/workbook.xml").decode())
+
+    def test_large_sheets_continue_in_new_sheets(self):
+        rows = [["x" * 100] for _ in range(10)]
+        archive = read_zip(stream_xlsx(["text"], rows, max_size=600))
+        sheets = self.get_sheets(archive)
+        self.assertGreater(len(sheets), 1)
+        self.assertEqual(sum(len(re.findall("x{100}", sheet)) for sheet in sheets), 10)
+        self.assertTrue(all(len(sheet) <= 600 or sheet.count("<row>") == 2 for sheet in sheets))
+
+    def test_empty_export_has_the_header(self):
+        archive = read_zip(stream_xlsx(["id"], []))
+        self.assertEqual([sheet.count("<row>") for sheet in self.get_sheets(archive)], [1])
+
+
+class ExportValueTests(SimpleTestCase):
+    def test_formulas_are_escaped(self):
+        for value in ("=1+1", "+1", "-1", "@SUM(A1)", "\tx", "\rx"):
+            self.assertEqual(get_export_value(value), "'" + value)
+
+    def test_html_lists_and_objects_are_escaped(self):
+        self.assertEqual(get_export_value(mark_safe("<b>=1+1</b>")), "'=1+1")
+        self.assertEqual(get_export_value(["=a", "b"]), "'=a, b")
+
+        class Customer:
+            def __str__(self):
+                return "=HYPERLINK(\"http://example.com\")"
+
+        self.assertEqual(get_export_value(Customer()), "'=HYPERLINK(\"http://example.com\")")
+
+    def test_plain_values_are_kept(self):
+        today = datetime.date.today()
+        for value in ("abc", 10, -1, Decimal("-2.5"), today, True):
+            self.assertEqual(get_export_value(value), value)
+        self.assertEqual(get_export_value(None), "")
+
+    def test_csv_and_xlsx_escape_formulas(self):
+        csv = b"".join(chunk.encode() for chunk in stream_csv(["a"], [[get_export_value("=1+1")]]))
+        self.assertEqual(csv, b"a\r\n'=1+1\r\n")
+        archive = read_zip(stream_xlsx(["a"], [[get_export_value("=1+1")]]))
+        self.assertIn("<t xml:space=\"preserve\">'=1+1</t>", archive.read("xl/worksheets/sheet1.xml").decode())
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        city = City.objects.create(name="Cuenca")
+        for name in ("Beto", "Ana", "Carla"):
+            Customer.objects.create(name=name, city=city)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_export_follows_the_keyset_ordering(self):
+        response = self.client.get("/shop/customer/export/")
+        content = b"".join(response.streaming_content).decode()
+        names = [line.split(",")[0] for line in content.splitlines()[1:]]
+        self.assertEqual(names, ["Carla", "Beto", "Ana"])
+
+        response = self.client.get("/shop/customer/")
+        self.assertEqual(
+            [row.split("|")[0] for row in response.content.decode().strip().split(";") if row],
+            names,
+        )
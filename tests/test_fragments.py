@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template import Template, TemplateSyntaxError
+from django.test import TestCase
+
+from hydra import site
+from hydra.fragments import get_fragments
+
+from .shop.models import City, Customer, Order
+
+
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.customer = Customer.objects.create(name="Ana", city=City.objects.create(name="Cuenca"))
+        cls.order = Order.objects.create(number="001", customer=cls.customer)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_rows_are_cached(self):
+        self.assertEqual(self.client.get("/shop/order/").content.decode().strip(), "001|001 - Ana|Ana;")
+        Order.objects.filter(pk=self.order.pk).update(number="002") # Sin señales
+        self.assertEqual(self.client.get("/shop/order/").content.decode().strip(), "001|001 - Ana|Ana;")
+
+    def test_related_changes_refresh_the_rows(self):
+        self.assertEqual(self.client.get("/shop/order/").content.decode().strip(), "001|001 - Ana|Ana;")
+        self.customer.name = "Eva"
+        self.customer.save()
+        self.assertEqual(self.client.get("/shop/order/").content.decode().strip(), "001|001 - Eva|Eva;")
+
+    def test_keys_are_per_user(self):
+        other = User.objects.create_superuser("other", "other@example.com", "other")
+        model_site = site.get_modelsite(Order)
+        model_site.compile()
+        keys = {
+            get_fragments(model_site, "list", [self.order], user)[0].key
+            for user in (self.user, other)
+        }
+        self.assertEqual(len(keys), 2)
+
+    def test_block_changes_discard_the_html(self):
+        def get_name(source):
+            template = Template("{% load hydra %}{% fragment row.fragment %}" + source + "{% endfragment %}")
+            return template.nodelist[-1].name
+
+        name = get_name("<td>{{ row.values }}</td>")
+        self.assertEqual(get_name("<td>{{ row.values }}</td>"), name)
+        self.assertNotEqual(get_name("<th>{{ row.values }}</th>"), name)
+        with mock.patch("hydra.settings.FRAGMENT_CACHE_VERSION", "2"):
+            self.assertNotEqual(get_name("<td>{{ row.values }}</td>"), name)
+
+    def test_csrf_token_is_refused(self):
+        with self.assertRaises(TemplateSyntaxError):
+            Template("{% load hydra %}{% fragment row.fragment %}{% csrf_token %}{% endfragment %}")
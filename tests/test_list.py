@@ -0,0 +1,63 @@
+import base64
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .shop.models import City, Customer, Order
+
+
+class ValuesListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        city = City.objects.create(name="Cuenca")
+        cls.customer = Customer.objects.create(name="Ana", city=city)
+        Order.objects.create(number="001", customer=cls.customer)
+        Order.objects.create(number="002", customer=cls.customer, archived=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_instances_come_from_the_site_queryset(self):
+        response = self.client.get("/shop/order/")
+        self.assertEqual(response.content.decode().strip(), "001|001 - Ana|Ana;")
+
+    def test_rows_deleted_between_queries_are_skipped(self):
+        from hydra.views.list import ListMixin
+
+        get_row_instances = ListMixin.get_row_instances
+
+        def delete_then_read(view, rows):
+            Order.objects.filter(number="001").delete()
+            return get_row_instances(view, rows)
+
+        with mock.patch.object(ListMixin, "get_row_instances", delete_then_read):
+            response = self.client.get("/shop/order/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().strip(), "")
+
+
+class KeysetCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        city = City.objects.create(name="Cuenca")
+        Customer.objects.bulk_create([Customer(name="Cliente %02d" % i, city=city) for i in range(12)])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_cursor(self, data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    def test_valid_cursor(self):
+        customer = Customer.objects.get(name="Cliente 02")
+        response = self.client.get("/shop/customer/", {"cursor": self.get_cursor([False, ["Cliente 02", customer.pk]])})
+        self.assertEqual(response.content.decode().strip(), "Cliente 01|Cuenca;Cliente 00|Cuenca;")
+
+    def test_forged_cursor_values_are_not_found(self):
+        for values in (["x", "abc"], ["x", None], ["x", [1]]):
+            response = self.client.get("/shop/customer/", {"cursor": self.get_cursor([False, values])})
+            self.assertEqual(response.status_code, 404, values)
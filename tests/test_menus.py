@@ -0,0 +1,68 @@
+from django.test import TestCase, override_settings
+
+from hydra import menus
+from hydra.cache import get_version
+from hydra.menus import get_menu_tree
+from hydra.models import Menu
+
+from .utils import bump_in_other_process, create_menu, shared_cache
+
+
+class MenuTreeTests(TestCase):
+    def setUp(self):
+        menus._tree = None
+
+    def test_tree_links_menus(self):
+        parent = create_menu("Tienda")
+        child = Menu.objects.create(name="Productos", parent=parent, action=parent.action, sequence=1)
+        tree = get_menu_tree()
+        self.assertEqual([menu.pk for menu in tree.roots], [parent.pk])
+        self.assertEqual(tree.get(parent.pk).children, [tree.get(child.pk)])
+        self.assertEqual(tree.match("/tienda/productos/1/").pk, child.pk)
+        self.assertEqual(
+            tree.get_breadcrumbs(tree.get(child.pk)),
+            (("Tienda", "/tienda/"), ("Productos", "/tienda/productos/")),
+        )
+
+    def test_saving_a_menu_reloads_the_tree(self):
+        tree = get_menu_tree()
+        menu = create_menu("Tienda")
+        self.assertIsNot(get_menu_tree(), tree)
+        self.assertIsNotNone(get_menu_tree().get(menu.pk))
+
+    def test_local_cache_tree_expires(self):
+        tree = get_menu_tree()
+        self.assertIs(get_menu_tree(), tree)
+        # Another process with its own LocMemCache saved a menu
+        tree.loaded_at -= 3600
+        self.assertIsNot(get_menu_tree(), tree)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_dummy_cache_loads_live(self):
+        tree = get_menu_tree()
+        # bulk_create sends no signals, nothing bumps the menu version
+        Menu.objects.bulk_create([
+            Menu(name="Tienda", route="tienda", action=create_menu("Ventas").action, sequence=2)
+        ])
+        self.assertIsNot(get_menu_tree(), tree)
+        self.assertIsNotNone(get_menu_tree().get_by_route("tienda"))
+
+    def test_shared_cache_tree_follows_other_processes(self):
+        with shared_cache() as location:
+            tree = get_menu_tree()
+            tree.loaded_at -= 3600
+            self.assertIs(get_menu_tree(), tree)
+            bump_in_other_process(location, "menu")
+            self.assertIsNot(get_menu_tree(), tree)
+
+
+class MenuVersionTests(TestCase):
+    def test_versions_are_bumped_again_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_menu("Tienda")
+        # Another request may cache the menus of the open transaction under these versions
+        versions = get_version("menu"), get_version("urls")
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_version("menu"), versions[0])
+        self.assertNotEqual(get_version("urls"), versions[1])
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import TransactionTestCase
+
+from hydra import site
+from hydra.objects import ObjectCache, get_written_rows
+
+from .shop.models import Product
+
+
+class WrittenRowsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = ObjectCache(Product)
+        post_save.connect(self.store.invalidate, sender=Product)
+        self.addCleanup(post_save.disconnect, self.store.invalidate, sender=Product)
+        self.product = Product.objects.create(name="Mesa")
+
+    def test_writes_are_forgotten_on_commit(self):
+        with transaction.atomic():
+            self.product.save()
+            self.assertEqual(get_written_rows(Product, "default"), {self.product.pk})
+        with transaction.atomic():
+            self.assertEqual(get_written_rows(Product, "default"), set())
+
+    def test_writes_are_forgotten_on_rollback(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.product.save()
+                raise ValueError
+        with transaction.atomic():
+            self.assertEqual(get_written_rows(Product, "default"), set())
+            self.store.get(Product.objects.all(), "slug", "mesa")
+            self.store.get(Product.objects.all(), "slug", "mesa")
+        self.assertEqual(self.store.stats()["bypasses"], 0)
+
+    def test_rolled_back_savepoints_are_forgotten(self):
+        other = Product.objects.create(name="Silla")
+        with transaction.atomic():
+            self.product.save()
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    other.save()
+                    raise ValueError
+            self.assertEqual(get_written_rows(Product, "default"), {self.product.pk})
+
+    def test_atomic_requests_do_not_bypass_after_commit(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+        model_site = site.get_modelsite(Product)
+
+        with mock.patch.object(model_site, "object_cache", True), \
+                mock.patch.object(model_site, "object_store", self.store), \
+                mock.patch.dict(connection.settings_dict, {"ATOMIC_REQUESTS": True}):
+            with transaction.atomic(): # Una request que guarda el producto
+                self.product.save()
+            for _ in range(3):
+                self.assertEqual(self.client.get("/shop/product/mesa/detail/").status_code, 200)
+
+        # El primer acceso guarda el pk del slug, el segundo el objeto
+        self.assertEqual(self.store.stats(), {"hits": 1, "misses": 2, "bypasses": 0})
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from hydra import ModelSite, site
+
+from .shop.models import Product
+
+
+class UniqueSlugTests(TestCase):
+    def test_slugs_are_unique(self):
+        slugs = [Product.objects.create(name="Silla roja").slug for _ in range(3)]
+        self.assertEqual(slugs, ["silla-roja", "silla-roja-2", "silla-roja-3"])
+
+    def test_empty_slug_reads_only_colliding_slugs(self):
+        Product.objects.create(name="Mesa")
+        model_site = site.get_modelsite(Product)
+        with CaptureQueriesContext(connection) as queries:
+            first = Product.objects.create(name="¡!")
+        self.assertEqual(first.slug, "")
+        self.assertNotIn("LIKE '%'", queries[0]["sql"])
+        self.assertEqual(model_site.get_unique_slug(Product(), ""), "-2")
+
+    def test_short_slug_reads_only_its_suffixes(self):
+        Product.objects.create(name="Abeja")
+        with CaptureQueriesContext(connection) as queries:
+            first = Product.objects.create(name="A")
+        self.assertEqual(first.slug, "a")
+        self.assertNotIn("LIKE 'a%'", queries[0]["sql"])
+        self.assertEqual(Product.objects.create(name="A").slug, "a-2")
+
+    def test_long_slugs_are_truncated_before_the_suffix(self):
+        name = "x" * 60
+        slugs = [Product.objects.create(name=name).slug for _ in range(11)]
+        self.assertEqual(slugs[0], "x" * 50)
+        self.assertEqual(slugs[1], "x" * 48 + "-2")
+        self.assertEqual(slugs[10], "x" * 47 + "-11")
+
+
+class UrlNameTests(TestCase):
+    def test_url_names_of_a_compiled_site(self):
+        model_site = site.get_modelsite(Product)
+        self.assertEqual(model_site.get_url_name("list"), "site:shop_product_list")
+
+    def test_url_names_of_an_uncompiled_site(self):
+        model_site = ModelSite(Product)
+        self.assertIsNone(model_site.plan)
+        self.assertEqual(model_site.get_base_url_name("list"), "shop_product_list")
+        self.assertEqual(model_site.get_url_name("detail"), "site:shop_product_detail")
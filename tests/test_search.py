@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase
+
+from hydra import site
+from hydra.search import SearchBackend, parse_search_terms
+
+from .shop.models import City, Customer
+
+
+class SearchBackendTests(TestCase):
+    def test_search_is_abstract(self):
+        class Backend(SearchBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            Backend(site.get_modelsite(Customer))
+
+    def test_parse_search_terms(self):
+        terms = parse_search_terms('factura "san juan" -anulada')
+        self.assertEqual(
+            [(term.text, term.phrase, term.exclude) for term in terms],
+            [("factura", False, False), ("san juan", True, False), ("anulada", False, True)],
+        )
+
+
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name="Cuenca")
+        Customer.objects.create(name="Juan Pérez", city=cls.city)
+        Customer.objects.create(name="Ana Torres", city=cls.city)
+
+    def setUp(self):
+        self.backend = site.get_modelsite(Customer).search_backend
+        self.backend._fts_ready.clear()
+
+    def search(self, value):
+        queryset = self.backend.search(Customer.objects.all(), value)
+        return [customer.name for customer in queryset]
+
+    def test_search_without_index_fails_loudly(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "rebuildsearchindex"):
+            self.search("juan")
+
+    def test_command_indexes_existing_rows(self):
+        call_command("rebuildsearchindex", "shop.Customer", stdout=StringIO())
+        self.assertEqual(self.search("juan"), ["Juan Pérez"])
+        self.assertEqual(self.search("perez"), ["Juan Pérez"])
+        self.assertEqual(self.search("-juan"), ["Ana Torres"])
+
+    def test_saved_rows_are_indexed(self):
+        call_command("rebuildsearchindex", stdout=StringIO())
+        customer = Customer.objects.create(name="Pedro Vera", city=self.city)
+        self.assertEqual(self.search("pedro"), ["Pedro Vera"])
+        customer.delete()
+        self.assertEqual(self.search("pedro"), [])
+
+    def test_search_runs_no_ddl(self):
+        call_command("rebuildsearchindex", stdout=StringIO())
+        with self.assertNumQueries(1):
+            self.search("juan")
@@ -0,0 +1,118 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import Resolver404, get_resolver, resolve, reverse
+
+from hydra import site
+from hydra.models import Menu
+from hydra.sites import Site
+
+from .utils import bump_in_other_process, create_menu, shared_cache
+
+
+class UrlsReloadTests(TestCase):
+    def setUp(self):
+        site.urls # Loaded by the urlconf
+        self.addCleanup(self.restore_urls)
+
+    def restore_urls(self):
+        Menu.objects.all().delete()
+        site.check_urls()
+
+    def assertResolves(self, path):
+        self.assertEqual(resolve(path).url_name, "shop_product_list")
+
+    def test_menu_change_reloads_urls(self):
+        site.check_urls()
+        self.assertResolves("/shop/product/")
+        create_menu("Tienda")
+        site.check_urls()
+        self.assertResolves("/tienda/")
+        with self.assertRaises(Resolver404):
+            resolve("/shop/product/")
+
+    def test_reload_swaps_only_the_site_urls(self):
+        site.check_urls()
+        previous = site.urls[0]
+        previous_patterns = list(previous)
+        root = get_resolver()
+        create_menu("Tienda")
+        site.check_urls()
+        self.assertIs(get_resolver(), root) # The url caches of Django are kept
+        self.assertEqual(previous, previous_patterns) # Other threads may still iterate it
+        self.assertIsNot(site.urls[0], previous)
+        self.assertEqual(reverse("site:shop_product_list"), "/tienda/")
+
+    def test_other_process_change_reloads_urls(self):
+        with shared_cache() as location:
+            action = create_menu("Ventas").action
+            site.check_urls()
+            # bulk_create sends no signals, as if the menu was saved by another process
+            Menu.objects.bulk_create([Menu(name="Tienda", route="tienda", action=action, sequence=2)])
+            with mock.patch.object(site, "get_urls", wraps=site.get_urls) as get_urls:
+                site.check_urls()
+                self.assertEqual(get_urls.call_count, 0)
+                bump_in_other_process(location, "urls")
+                site.check_urls()
+                self.assertEqual(get_urls.call_count, 1)
+            self.assertResolves("/tienda/")
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_dummy_cache_urls_expire(self):
+        site.check_urls()
+        with mock.patch.object(site, "get_urls", wraps=site.get_urls) as get_urls:
+            site.check_urls()
+            self.assertEqual(get_urls.call_count, 0)
+            site._urls_loaded_at -= 3600
+            site.check_urls()
+            self.assertEqual(get_urls.call_count, 1)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "routes.json")
+        patcher = mock.patch("hydra.settings.ROUTES_SNAPSHOT", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_site(self):
+        other = Site()
+        other._registry = site._registry
+        return other
+
+    def test_snapshot_builds_urls_without_queries(self):
+        with shared_cache():
+            create_menu("Tienda")
+            call_command("snapshotroutes", stdout=StringIO())
+            with self.assertNumQueries(0):
+                urlpatterns = self.get_site().urls[0]
+            self.assertEqual([str(pattern.pattern) for pattern in urlpatterns], ["tienda/"])
+
+    def test_snapshot_older_than_the_routes_is_refreshed_on_change(self):
+        with shared_cache() as location:
+            create_menu("Tienda")
+            call_command("snapshotroutes", stdout=StringIO())
+            # A worker started after another process changed the menus
+            Menu.objects.filter(name="Tienda").update(route="ventas")
+            bump_in_other_process(location, "urls")
+            other = self.get_site()
+            with self.assertLogs("hydra.snapshot", "WARNING"), self.assertNumQueries(0):
+                urlpatterns = other.urls[0]
+            self.assertEqual([str(pattern.pattern) for pattern in urlpatterns], ["tienda/"])
+            bump_in_other_process(location, "urls")
+            other.check_urls()
+            self.assertEqual([str(pattern.pattern) for pattern in other.urls[0]], ["ventas/"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_snapshot_is_used_without_a_shared_cache(self):
+        create_menu("Tienda")
+        call_command("snapshotroutes", stdout=StringIO())
+        with self.assertLogs("hydra.snapshot", "WARNING"), self.assertNumQueries(0):
+            urlpatterns = self.get_site().urls[0]
+        self.assertEqual([str(pattern.pattern) for pattern in urlpatterns], ["tienda/"])
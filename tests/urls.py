@@ -0,0 +1,7 @@
+from django.urls import path
+
+from hydra import site
+
+urlpatterns = [
+    path("", site.urls),
+]
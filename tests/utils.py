@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from django.test import override_settings
+
+from hydra.models import Action, Menu
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUMP_SCRIPT = """
+import sys
+import django
+django.setup()
+from django.test import override_settings
+from hydra.cache import bump_version
+with override_settings(CACHES={"default": {"BACKEND": sys.argv[1], "LOCATION": sys.argv[2]}}):
+    bump_version(sys.argv[3])
+"""
+
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+@contextmanager
+def shared_cache():
+    """Caché en archivos, compartida con los procesos que lanza bump_in_other_process"""
+    with tempfile.TemporaryDirectory() as location:
+        with override_settings(CACHES={"default": {"BACKEND": FILE_CACHE, "LOCATION": location}}):
+            yield location
+
+
+def bump_in_other_process(location, name):
+    """Incrementa la versión `name` desde otro proceso de python"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="tests.settings")
+    subprocess.run(
+        [sys.executable, "-c", BUMP_SCRIPT, FILE_CACHE, location, name],
+        cwd=ROOT, env=env, check=True,
+    )
+
+
+def create_menu(name, sequence=1, element="product"):
+    action, _ = Action.objects.get_or_create(
+        to=Action.ToChoices.MODEL, app_label="shop", element=element,
+        defaults={"name": element.title()},
+    )
+    return Menu.objects.create(name=name, action=action, sequence=sequence)